@@ -8,14 +8,17 @@ It encapsulates the logic of checking the cache first, then running the
 engine for any cache misses, and finally caching the new results.
 """
 import logging
-from typing import Dict, List, Any, Optional, Set, Tuple
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Any, Optional, Set, Tuple, Union
 
 import chess.pgn
 
 # Import services and data contracts
 from chess_analyzer.engine.stockfish_controller import StockfishController
+from chess_analyzer.engine.stockfish_pool import StockfishPool
 from chess_analyzer.cache.db_manager import DBManager, CacheKey, CacheEntry
 from chess_analyzer.pgn.pgn_handler import PGNHandler
+from chess_analyzer.config import settings
 from chess_analyzer.types import ProgressReporter, MoveData
 from chess_analyzer.exceptions import StockfishError, CacheError
 
@@ -36,7 +39,8 @@ class AnalysisProvider:
         stockfish_version: str,
         # --- Service Components (Injected) ---
         db_manager: DBManager,
-        stockfish_controller: StockfishController,
+        stockfish_controller: Union[StockfishController, StockfishPool],
+        run_memo_size: int = settings.RUN_ANALYSIS_MEMO_SIZE,
     ):
         """
         Initializes the AnalysisProvider with required components and settings.
@@ -48,6 +52,11 @@ class AnalysisProvider:
         self.db_manager = db_manager
         self.stockfish_controller = stockfish_controller
 
+        # LRU of analyses already served, shared by all games of a run. Positions common
+        # to many games (e.g. opening theory) are fetched from the cache or engine once.
+        self._run_memo: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+        self._run_memo_capacity = run_memo_size
+
         logger.debug("AnalysisProvider initialized.")
 
     def _get_required_fens(self, game: chess.pgn.Game) -> Set[str]:
@@ -71,42 +80,78 @@ class AnalysisProvider:
         
         return required_fens
 
+    def _remember_analyses(self, analyses: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Adds analyses to the run memo, evicting the least recently used entries when full."""
+        if self._run_memo_capacity <= 0:
+            return
+        run_memo = self._run_memo
+        for fen, analysis in analyses.items():
+            if analysis is not None:
+                run_memo[fen] = analysis
+        while len(run_memo) > self._run_memo_capacity:
+            run_memo.popitem(last=False)
+
     def get_analyses_for_game(
-        self, game: chess.pgn.Game, progress: ProgressReporter
+        self,
+        game: chess.pgn.Game,
+        progress: ProgressReporter,
+        required_fens: Optional[Iterable[str]] = None,
     ) -> Tuple[Dict[str, List[Dict[str, Any]]], int, int]:
         """
         The single public method for this class. It encapsulates all the logic
         for planning and fetching analyses for a given game.
 
+        Args:
+            game: The game to fetch analyses for.
+            progress: Reporter for the per-game FEN progress.
+            required_fens: The game's unique FENs, if the caller has already collected
+                           them; otherwise they are computed from the game.
+
         Returns:
             A tuple of (analyses_dict, cache_hits, engine_analyses_count).
         """
         # Step 1: Plan the analysis by finding all unique positions.
-        required_fens = self._get_required_fens(game)
+        if required_fens is None:
+            required_fens = self._get_required_fens(game)
+        else:
+            required_fens = list(dict.fromkeys(required_fens))
         if not required_fens:
             return {}, 0, 0
         
         progress.reset(total=len(required_fens))
         game_id_short = (game.headers.get("GameId") or "N/A")[:8]
-        
-        # Step 2: Fetch all possible results from the cache in a single batch.
+
+        # Step 2: Serve positions already seen earlier in this run from memory.
+        all_analyses: Dict[str, List[Dict[str, Any]]] = {}
+        unseen_fens: List[str] = []
+        run_memo = self._run_memo
+        for fen in required_fens:
+            analysis = run_memo.get(fen)
+            if analysis is None:
+                unseen_fens.append(fen)
+            else:
+                run_memo.move_to_end(fen)
+                all_analyses[fen] = analysis
+
+        # Step 3: Fetch all other possible results from the cache in a single batch.
         progress.set_description(f"  Game {game_id_short} (Cache)")
         cached_analyses = self.db_manager.get_cached_analyses_batch(
-            fens=list(required_fens),
+            fens=unseen_fens,
             analysis_depth=self.analysis_depth,
             multipv_count=self.multipv_count,
             stockfish_path_canon=self.stockfish_path,
             stockfish_version=self.stockfish_version,
-        )
-        cache_hits = len(cached_analyses)
+        ) if unseen_fens else {}
+        all_analyses.update(cached_analyses)
+        cache_hits = len(all_analyses)
         progress.update(cache_hits)
+        self._remember_analyses(cached_analyses)
 
-        # Step 3: Determine which FENs were cache misses and need engine analysis.
-        all_analyses = cached_analyses.copy()
-        fens_to_analyze = [fen for fen in required_fens if fen not in cached_analyses]
+        # Step 4: Determine which FENs were cache misses and need engine analysis.
+        fens_to_analyze = [fen for fen in unseen_fens if fen not in cached_analyses]
         engine_runs = len(fens_to_analyze)
 
-        # Step 4: Run the engine for all cache misses in a single batch.
+        # Step 5: Run the engine for all cache misses in a single batch.
         if fens_to_analyze:
             progress.set_description(f"  Game {game_id_short} (Engine)")
             
@@ -117,8 +162,9 @@ class AnalysisProvider:
                 fens_to_analyze, progress_callback=engine_callback
             )
             all_analyses.update(newly_analyzed)
+            self._remember_analyses(newly_analyzed)
 
-            # Step 5: Cache the new results for future runs.
+            # Step 6: Cache the new results for future runs.
             entries_to_cache = [
                 CacheEntry(
                     key=CacheKey(fen, self.analysis_depth, self.multipv_count, self.stockfish_path, self.stockfish_version),
@@ -129,4 +175,4 @@ class AnalysisProvider:
             if entries_to_cache:
                 self.db_manager.store_analyses_batch(entries_to_cache)
 
-        return all_analyses, cache_hits, engine_runs
\ No newline at end of file
+        return all_analyses, cache_hits, engine_runs
@@ -7,12 +7,18 @@ by calculating Centipawn Loss (CPL), and identifies special categories like
 "Brilliant" or "Great" moves according to specific criteria.
 """
 import logging
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import chess
 
 from chess_analyzer.config import settings
-from chess_analyzer.types import ClassificationResult, MoveAnalysisContext
+from chess_analyzer.types import (
+    BrilliantMoveCriteria,
+    ClassificationResult,
+    GreatMoveCriteria,
+    MoveAnalysisColumns,
+    MoveAnalysisContext,
+)
 from chess_analyzer.utils.chess_utils import get_material_diff
 
 logger = logging.getLogger(settings.APP_NAME + ".MoveClassifier")
@@ -35,73 +41,76 @@ class MoveClassifier:
         """Initializes the MoveClassifier."""
         logger.debug("MoveClassifier initialized.")
 
-    def _is_significant_piece_sacrifice(self, context: MoveAnalysisContext) -> bool:
-        """Determines if a move involved a significant piece sacrifice."""
-        diff_before = get_material_diff(context.board_before_move, context.player_color)
-        diff_after = get_material_diff(context.board_after_move, context.player_color)
-        
+    def _is_significant_piece_sacrifice(
+        self,
+        diff_before: float,
+        diff_after: float,
+        criteria: BrilliantMoveCriteria,
+    ) -> bool:
+        """
+        Determines if a move involved a significant piece sacrifice, given the
+        player's material difference before and after the move.
+        """
         # A sacrifice means the player's material advantage decreased.
         # e.g., before: +1 (up a pawn), after: -2 (down a knight for the pawn).
         # Change in diff = (-2) - (1) = -3. Net loss is 3.
         net_material_loss = diff_before - diff_after
         
-        criteria = context.brilliant_criteria
         return net_material_loss >= criteria.min_sacrifice_net_material_pawns
 
-    def _check_for_brilliant(self, context: MoveAnalysisContext, raw_cpl: float) -> Optional[ClassificationResult]:
-        """Checks if a move qualifies as 'Brilliant ✨'."""
-        criteria = context.brilliant_criteria
-        
+    def _passes_brilliant_eval_checks(
+        self,
+        criteria: BrilliantMoveCriteria,
+        raw_cpl: float,
+        eval_before: Optional[float],
+        is_mate_before: bool,
+        eval_player: Optional[float],
+    ) -> bool:
+        """Checks the evaluation-only conditions for a 'Brilliant ✨' move (no board needed)."""
         # Condition 0: Required evals must exist.
-        if context.eval_player_move is None or context.eval_before_move is None:
-            return None
+        if eval_player is None or eval_before is None:
+            return False
         
         # Condition 1: Move is objectively good (low raw CPL).
         if raw_cpl > criteria.max_cpl:
-            return None
+            return False
 
         # Condition 2: Position was not already decisively won.
-        if context.is_mate_before_move and context.eval_before_move > 0:
-             return None # Already delivering mate.
-        if not context.is_mate_before_move and context.eval_before_move > criteria.max_eval_before_move_cp:
-            return None
+        if is_mate_before and eval_before > 0:
+            return False # Already delivering mate.
+        if not is_mate_before and eval_before > criteria.max_eval_before_move_cp:
+            return False
 
         # Condition 3: Evaluation after the move is sound (doesn't drop too much).
-        eval_drop = context.eval_before_move - context.eval_player_move
-        if eval_drop > criteria.eval_drop_leniency_cp:
-            return None
-            
-        # Condition 4: Involves a significant piece sacrifice.
-        if not self._is_significant_piece_sacrifice(context):
-            return None
-
-        logger.debug(f"Move {context.player_move_uci} by {chess.COLOR_NAMES[context.player_color]} classified as Brilliant.")
-        return ClassificationResult("Brilliant ✨", 0.0, raw_cpl, is_brilliant=True)
-
-    def _check_for_great(self, context: MoveAnalysisContext, is_top_choice: bool) -> Optional[ClassificationResult]:
+        eval_drop = eval_before - eval_player
+        return eval_drop <= criteria.eval_drop_leniency_cp
+
+    def _is_great_move(
+        self,
+        criteria: GreatMoveCriteria,
+        engine_multipv: int,
+        is_top_choice: bool,
+        eval_best: Optional[float],
+        is_mate_best: bool,
+        eval_second: Optional[float],
+        is_mate_second: bool,
+    ) -> bool:
         """Checks if a move qualifies as 'Great Move !'."""
-        criteria = context.great_criteria
-
         # Condition 1: Player played the engine's best move, and MultiPV >= 2.
-        if not is_top_choice or context.engine_multipv < 2:
-            return None
+        if not is_top_choice or engine_multipv < 2:
+            return False
             
         # Condition 2: Required evals must exist.
-        if context.eval_best_move is None or context.eval_second_best_move is None:
-            return None
+        if eval_best is None or eval_second is None:
+            return False
 
         # Condition 3: Not a mate scenario (where CPL is less meaningful).
-        if context.is_mate_best_move or context.is_mate_second_best_move:
-            return None
+        if is_mate_best or is_mate_second:
+            return False
 
         # Condition 4: The best move is significantly better than the second best.
-        uniqueness_gain = context.eval_best_move - context.eval_second_best_move
-        if uniqueness_gain < criteria.min_uniqueness_gain_cp:
-            return None
-
-        logger.debug(f"Move {context.player_move_uci} by {chess.COLOR_NAMES[context.player_color]} classified as Great.")
-        # CPL for a great move is 0, as it's the engine's best.
-        return ClassificationResult("Great Move !", 0.0, 0.0, is_great=True, is_engine_top_choice=True, is_engine_top_n_choice=True)
+        uniqueness_gain = eval_best - eval_second
+        return uniqueness_gain >= criteria.min_uniqueness_gain_cp
 
     def _get_standard_classification(self, cpl: float) -> str:
         """Gets the classification text based on CPL using the data-driven settings."""
@@ -110,39 +119,65 @@ class MoveClassifier:
                 return name
         return "Blunder" # Fallback for anything above the last threshold
 
-    def classify_move(self, context: MoveAnalysisContext) -> ClassificationResult:
+    def _classify(
+        self,
+        eval_best: Optional[float],
+        is_mate_best: bool,
+        eval_second: Optional[float],
+        is_mate_second: bool,
+        eval_player: Optional[float],
+        is_mate_player: bool,
+        engine_top_lines: List[Dict[str, Any]],
+        player_move_uci: str,
+        player_color: chess.Color,
+        engine_multipv: int,
+        brilliant_criteria: BrilliantMoveCriteria,
+        great_criteria: GreatMoveCriteria,
+        get_material_diffs: Callable[[], Tuple[float, float]],
+    ) -> ClassificationResult:
         """
-        Classifies a player's move using a structured context and delegates to helpers.
+        Shared classification logic. The player's material differences before and
+        after the move are only requested (via `get_material_diffs`) when a move
+        passes every evaluation check for a 'Brilliant ✨' move.
         """
         # --- Pre-calculation ---
-        if context.eval_best_move is None or context.eval_player_move is None:
-            return ClassificationResult("Unavailable (eval error)", 0.0, 0.0)
+        if eval_best is None or eval_player is None:
+            return ClassificationResult("Unavailable (eval error)", 0.0, 0.0, classification_name="Unavailable")
 
-        capped_eval_best = _cap_score(context.eval_best_move, context.is_mate_best_move)
-        capped_eval_player = _cap_score(context.eval_player_move, context.is_mate_player_move)
+        capped_eval_best = _cap_score(eval_best, is_mate_best)
+        capped_eval_player = _cap_score(eval_player, is_mate_player)
         
         raw_cpl = capped_eval_best - capped_eval_player
         cpl_for_metrics = min(settings.ACPL_MOVE_CPL_CAP_CP, max(0.0, raw_cpl))
 
-        is_top_choice = bool(context.engine_top_lines and context.player_move_uci == context.engine_top_lines[0].get('Move'))
+        is_top_choice = bool(engine_top_lines and player_move_uci == engine_top_lines[0].get('Move'))
         is_top_n_choice = is_top_choice or any(
-            context.player_move_uci == line.get('Move') for line in context.engine_top_lines
+            player_move_uci == line.get('Move') for line in engine_top_lines
         )
 
         # --- Classification Logic (Delegation) ---
         
-        # 1. Check for Brilliant (highest priority)
-        if (brilliant_result := self._check_for_brilliant(context, raw_cpl)):
-            # Use dataclasses.replace to create a new instance with updated fields
-            return brilliant_result.__class__(
-                **brilliant_result.__dict__, 
-                is_engine_top_choice=is_top_choice, 
-                is_engine_top_n_choice=is_top_n_choice
-            )
+        # 1. Check for Brilliant (highest priority). The evaluation before the move
+        # is the engine's best-move evaluation.
+        if self._passes_brilliant_eval_checks(brilliant_criteria, raw_cpl, eval_best, is_mate_best, eval_player):
+            diff_before, diff_after = get_material_diffs()
+            if self._is_significant_piece_sacrifice(diff_before, diff_after, brilliant_criteria):
+                logger.debug(f"Move {player_move_uci} by {chess.COLOR_NAMES[player_color]} classified as Brilliant.")
+                return ClassificationResult(
+                    "Brilliant ✨", 0.0, raw_cpl, is_brilliant=True,
+                    is_engine_top_choice=is_top_choice,
+                    is_engine_top_n_choice=is_top_n_choice,
+                    classification_name="Brilliant ✨",
+                )
 
         # 2. Check for Great
-        if (great_result := self._check_for_great(context, is_top_choice)):
-            return great_result
+        if self._is_great_move(great_criteria, engine_multipv, is_top_choice, eval_best, is_mate_best, eval_second, is_mate_second):
+            logger.debug(f"Move {player_move_uci} by {chess.COLOR_NAMES[player_color]} classified as Great.")
+            # CPL for a great move is 0, as it's the engine's best.
+            return ClassificationResult(
+                "Great Move !", 0.0, 0.0, is_great=True, is_engine_top_choice=True, is_engine_top_n_choice=True,
+                classification_name="Great Move !",
+            )
 
         # 3. Standard CPL-based classification
         classification_name = self._get_standard_classification(cpl_for_metrics)
@@ -151,7 +186,8 @@ class MoveClassifier:
         if classification_name == "Best":
             classification_text = classification_name
         elif classification_name == "Blunder":
-            classification_text = f"Blunder !!! (CPL: {cpl_for_metrics:.0f})"
+            classification_name = "Blunder !!!"
+            classification_text = f"{classification_name} (CPL: {cpl_for_metrics:.0f})"
         else:
             classification_text = f"{classification_name} (CPL: {cpl_for_metrics:.0f})"
 
@@ -160,5 +196,47 @@ class MoveClassifier:
             cpl=cpl_for_metrics,
             raw_cpl=raw_cpl,
             is_engine_top_choice=is_top_choice,
-            is_engine_top_n_choice=is_top_n_choice
-        )
\ No newline at end of file
+            is_engine_top_n_choice=is_top_n_choice,
+            classification_name=classification_name,
+        )
+
+    def classify_move(self, context: MoveAnalysisContext) -> ClassificationResult:
+        """
+        Classifies a player's move using a structured context and delegates to helpers.
+        """
+        return self._classify(
+            context.eval_best_move, context.is_mate_best_move,
+            context.eval_second_best_move, context.is_mate_second_best_move,
+            context.eval_player_move, context.is_mate_player_move,
+            context.engine_top_lines, context.player_move_uci, context.player_color,
+            context.engine_multipv, context.brilliant_criteria, context.great_criteria,
+            get_material_diffs=lambda: (
+                get_material_diff(context.board_before_move, context.player_color),
+                get_material_diff(context.board_after_move, context.player_color),
+            ),
+        )
+
+    def classify_batch(
+        self,
+        columns: MoveAnalysisColumns,
+        get_material_diffs: Callable[[int], Tuple[float, float]],
+    ) -> List[ClassificationResult]:
+        """
+        Classifies every move of a game from column-oriented evaluation data.
+
+        Args:
+            columns: Per-ply evaluations and supporting data for the whole game.
+            get_material_diffs: Returns the mover's (before, after) material differences
+                                for a ply index. Only called for moves that may be a sacrifice.
+        """
+        results: List[ClassificationResult] = []
+        for i in range(len(columns.player_move_ucis)):
+            results.append(self._classify(
+                columns.eval_best_move[i], columns.is_mate_best_move[i],
+                columns.eval_second_best_move[i], columns.is_mate_second_best_move[i],
+                columns.eval_player_move[i], columns.is_mate_player_move[i],
+                columns.engine_top_lines[i], columns.player_move_ucis[i], columns.player_colors[i],
+                columns.engine_multipv, columns.brilliant_criteria, columns.great_criteria,
+                get_material_diffs=lambda i=i: get_material_diffs(i),
+            ))
+        return results
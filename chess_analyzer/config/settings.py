@@ -29,6 +29,30 @@ DEFAULT_STOCKFISH_THREADS: Final[int] = 4
 DEFAULT_STOCKFISH_HASH_MB: Final[int] = 1024
 """Default hash memory (in MB) for Stockfish."""
 
+DEFAULT_ENGINE_WORKERS: Final[int] = 1
+"""
+Default number of parallel Stockfish processes.
+1 runs a single engine sequentially; 0 starts one single-threaded engine per CPU core.
+"""
+
+MIN_STOCKFISH_HASH_MB_PER_WORKER: Final[int] = 16
+"""Lower bound for the hash memory (in MB) given to each engine in a worker pool."""
+
+ENGINE_MEMO_CACHE_SIZE: Final[int] = 4096
+"""Maximum number of recent analyses each engine controller keeps in memory. 0 disables it."""
+
+RUN_ANALYSIS_MEMO_SIZE: Final[int] = 20000
+"""Maximum number of analyses kept in memory across the games of a run, so positions shared
+between games are neither re-read from the cache database nor re-analyzed. 0 disables it."""
+
+ENGINE_PIPELINE_CHUNK_SIZE: Final[int] = 8
+"""Number of 'position'/'go' command pairs written to the engine before reading their results."""
+
+ENGINE_QUIT_TIMEOUT_S: Final[float] = 0.5
+"""Seconds to wait for the engine to exit after 'quit' (and again after a kill) before giving up."""
+ENGINE_READY_TIMEOUT_S: Final[float] = 2.0
+"""Seconds to wait for 'readyok' when pinging or soft-resetting the engine before restarting it."""
+
 # --- Score Interpretation and Normalization ---
 MATE_SCORE_EQUIVALENT_CP: Final[float] = 30000.0
 """A large centipawn value used to numerically represent a mate."""
@@ -46,6 +70,15 @@ PV_MAX_MOVES_IN_COMMENT: Final[int] = 3
 PGN_DEFAULT_COLUMNS: Final[int] = 80
 """Default PGN move text wrapping width for output files."""
 
+PGN_EXPORT_FLUSH_INTERVAL: Final[int] = 50
+"""Number of exported games between flushes of the output PGN and its processed game ID index."""
+
+PGN_PREFETCH_GAMES: Final[int] = 4
+"""Number of games parsed ahead on a background thread while the current game is analyzed."""
+
+SAN_CACHE_SIZE: Final[int] = 8192
+"""Maximum number of (position, move) SAN conversions memoized while annotating."""
+
 
 # --- CPL-based Move Classification Thresholds (Data-Driven) ---
 # The list is ordered from best to worst.
@@ -77,6 +110,17 @@ GREAT_CRITERIA: Final[GreatMoveCriteria] = GreatMoveCriteria(
 )
 
 
+# --- Progress Display ---
+PROGRESS_MIN_INTERVAL_S: Final[float] = 0.5
+"""Minimum number of seconds between progress bar repaints."""
+
+PROGRESS_MIN_ITERS: Final[int] = 64
+"""Minimum number of progress updates between progress bar repaints."""
+
+PROGRESS_UPDATE_BATCH: Final[int] = 32
+"""Number of progress steps accumulated before they are passed on to the progress bar."""
+
+
 # --- File Names and Paths ---
 DB_CACHE_FILENAME: Final[str] = "chess_analyzer_cache.db"
 """Filename for the SQLite database used for caching FEN analyses."""
@@ -87,6 +131,9 @@ DEFAULT_CUSTOM_REPORT_FILENAME: Final[str] = "analysis_summary_report.csv"
 DEFAULT_LOG_FILENAME: Final[str] = "chess_analyzer.log"
 """Default filename for the application log."""
 
+PROCESSED_IDS_INDEX_SUFFIX: Final[str] = ".ids"
+"""Suffix of the sidecar file, next to the output PGN, listing the IDs of games already exported."""
+
 # --- PGN Parsing and Error Handling ---
 PGN_MALFORMED_SKIP_LINE_LIMIT: Final[int] = 1000
 """Maximum number of lines to skip when encountering a malformed PGN entry."""
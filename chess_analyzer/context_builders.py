@@ -7,8 +7,10 @@ structured `dataclass` context objects used by various components. It
 isolates the "messy" work of converting raw analysis data into a clean,
 usable format.
 """
-from collections import Counter
-from typing import Any, Callable, Dict, List, Optional, Tuple
+import sys
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import chess
 import chess.pgn
@@ -19,64 +21,137 @@ from chess_analyzer.types import (
     ClassificationResult,
     EngineLineInfo,
     GameSummary,
+    MoveAnalysisColumns,
     MoveAnalysisContext,
     MoveData,
+    PlayerMoveTally,
 )
 
+# Settings read on every move, bound once at import time (they are constants).
+_MATE_CP = settings.MATE_SCORE_EQUIVALENT_CP
+_PV_MAX_MOVES = settings.PV_MAX_MOVES_IN_COMMENT
+_SAN_CACHE_SIZE = settings.SAN_CACHE_SIZE
+_BRILLIANT_CRITERIA = settings.BRILLIANT_CRITERIA
+_GREAT_CRITERIA = settings.GREAT_CRITERIA
+
 # --- Score Transformation ---
 
-def get_score_from_line(
-    line: Optional[Dict[str, Any]], perspective: chess.Color
-) -> Tuple[Optional[float], bool, Optional[int]]:
+def _score_line_wpov(line: Optional[Dict[str, Any]]) -> Tuple[Optional[float], bool, Optional[int]]:
+    """Scores a single engine line from White's point of view."""
     if not line:
         return None, False, None
 
-    is_mate = False
-    score_wpov = None
-    mate_moves_wpov = None
-
+    # Engine lines normally carry ints; only legacy/cached string values need parsing.
     mate_val = line.get("Mate")
-    cp_val = line.get("Centipawn")
-
     if mate_val is not None:
-        try:
-            mate_moves_wpov = int(mate_val)
-            is_mate = True
-            if mate_moves_wpov == 0:
-                is_mate = False
-                score_wpov = 0.0
-            elif mate_moves_wpov > 0:
-                score_wpov = settings.MATE_SCORE_EQUIVALENT_CP - abs(mate_moves_wpov)
-            else:
-                score_wpov = -settings.MATE_SCORE_EQUIVALENT_CP + abs(mate_moves_wpov)
-        except (TypeError, ValueError):
-            mate_moves_wpov = None
-            is_mate = False
-    elif cp_val is not None:
-        try:
-            score_wpov = float(cp_val)
-        except (TypeError, ValueError):
-            score_wpov = None
+        if isinstance(mate_val, int):
+            mate_moves_wpov = mate_val
+        else:
+            try:
+                mate_moves_wpov = int(mate_val)
+            except (TypeError, ValueError):
+                return None, False, None
+        if mate_moves_wpov == 0:
+            return 0.0, False, None
+        if mate_moves_wpov > 0:
+            return _MATE_CP - mate_moves_wpov, True, mate_moves_wpov
+        return -_MATE_CP - mate_moves_wpov, True, mate_moves_wpov
 
-    if score_wpov is None:
+    cp_val = line.get("Centipawn")
+    if cp_val is None:
+        return None, False, None
+    if isinstance(cp_val, (int, float)):
+        return float(cp_val), False, None
+    try:
+        return float(cp_val), False, None
+    except (TypeError, ValueError):
         return None, False, None
 
-    if perspective == chess.WHITE:
+def get_score_from_line(
+    line: Optional[Dict[str, Any]], perspective: chess.Color
+) -> Tuple[Optional[float], bool, Optional[int]]:
+    score_wpov, is_mate, mate_moves_wpov = _score_line_wpov(line)
+    if score_wpov is None or perspective == chess.WHITE:
         return score_wpov, is_mate, mate_moves_wpov
-    else:
-        mate_moves_for_black = -mate_moves_wpov if is_mate and mate_moves_wpov is not None else None
-        return -score_wpov, is_mate, mate_moves_for_black
+    return -score_wpov, is_mate, -mate_moves_wpov if mate_moves_wpov is not None else None
+
+def score_lines_batch(
+    lines: Sequence[Optional[Dict[str, Any]]], perspective: chess.Color
+) -> Tuple[List[Optional[float]], List[bool], List[Optional[int]]]:
+    """
+    Scores several engine lines in one pass.
+
+    Returns parallel lists of (scores, is_mate flags, mate distances), with the
+    same semantics as `get_score_from_line` applied to each line.
+    """
+    scores: List[Optional[float]] = []
+    is_mates: List[bool] = []
+    mate_moves: List[Optional[int]] = []
+    flip = perspective != chess.WHITE
+
+    for line in lines:
+        score, is_mate, moves = _score_line_wpov(line)
+        if flip and score is not None:
+            score = -score
+            if moves is not None:
+                moves = -moves
+        scores.append(score)
+        is_mates.append(is_mate)
+        mate_moves.append(moves)
+
+    return scores, is_mates, mate_moves
+
+# --- SAN Conversion ---
+
+# Bounded LRU memo of SAN strings keyed by position and UCI move. Consecutive positions
+# share most of their PV moves, and openings repeat across games.
+_SANCacheKey = Tuple[str, chess.Color, chess.Bitboard, Optional[chess.Square], bool, str]
+_SAN_CACHE: "OrderedDict[_SANCacheKey, str]" = OrderedDict()
+
+def _cached_san(board: chess.Board, move_uci: str) -> str:
+    """Converts a UCI move to SAN for the given board, memoizing the result."""
+    key = (board.board_fen(), board.turn, board.castling_rights, board.ep_square, board.chess960, move_uci)
+    san = _SAN_CACHE.get(key)
+    if san is not None:
+        _SAN_CACHE.move_to_end(key)
+        return san
+    san = board.san(chess.Move.from_uci(move_uci))
+    _SAN_CACHE[key] = san
+    if len(_SAN_CACHE) > _SAN_CACHE_SIZE:
+        _SAN_CACHE.popitem(last=False)
+    return san
+
+def _pv_to_san(board: chess.Board, pv_ucis: List[str]) -> List[str]:
+    """
+    Converts a PV to SAN by pushing its moves onto `board`, then popping them
+    back so the board is left unchanged.
+    """
+    pv_san_list: List[str] = []
+    pushed = 0
+    for move_uci in pv_ucis:
+        try:
+            pv_san_list.append(_cached_san(board, move_uci))
+            board.push(chess.Move.from_uci(move_uci))
+            pushed += 1
+        except ValueError:
+            pv_san_list.append(f"{move_uci}?")
+            break
+    for _ in range(pushed):
+        board.pop()
+    return pv_san_list
 
 # --- Context Builders ---
 
 def build_move_analysis_context(
     move_data: MoveData,
-    analyses: Dict[str, List[Dict[str, Any]]],
+    lines_before: Optional[List[Dict[str, Any]]],
+    lines_after: Optional[List[Dict[str, Any]]],
     multipv_setting: int,
 ) -> MoveAnalysisContext:
-    """Constructs the context object required by the MoveClassifier."""
-    lines_before = analyses.get(move_data.fen_before_move)
-    lines_after = analyses.get(move_data.fen_after_move)
+    """
+    Constructs the context object required by `MoveClassifier.classify_move`
+    from the engine lines for the positions before and after the move.
+    """
     player = move_data.board_before_move.turn
 
     # Get evals from the moving player's perspective
@@ -84,9 +159,9 @@ def build_move_analysis_context(
     second_best_line = lines_before[1] if lines_before and len(lines_before) > 1 else None
     player_move_line = lines_after[0] if lines_after else None
 
-    eval_best, mate_best, _ = get_score_from_line(best_line, player)
-    eval_second, mate_second, _ = get_score_from_line(second_best_line, player)
-    eval_player, mate_player, _ = get_score_from_line(player_move_line, player)
+    (eval_best, eval_second, eval_player), (mate_best, mate_second, mate_player), _ = score_lines_batch(
+        (best_line, second_best_line, player_move_line), player
+    )
 
     # The evaluation of the position before the move is the same as the engine's best move eval
     eval_before, mate_before = eval_best, mate_best
@@ -98,52 +173,104 @@ def build_move_analysis_context(
         eval_before_move=eval_before, is_mate_before_move=mate_before,
         engine_top_lines=lines_before or [],
         player_move_uci=move_data.actual_move_obj.uci(),
-        board_before_move=move_data.board_before_move,
+        board_before_move=move_data.materialize_board(),
         board_after_move=move_data.pgn_node.board(),
         player_color=player,
         engine_multipv=multipv_setting,
-        brilliant_criteria=settings.BRILLIANT_CRITERIA,
-        great_criteria=settings.GREAT_CRITERIA,
+        brilliant_criteria=_BRILLIANT_CRITERIA,
+        great_criteria=_GREAT_CRITERIA,
+    )
+
+def _to_player_perspective(
+    scores_wpov: List[Optional[float]], player_colors: List[chess.Color]
+) -> List[Optional[float]]:
+    """Flips White-POV scores for the plies where Black is the moving player."""
+    return [
+        score if score is None or color == chess.WHITE else -score
+        for score, color in zip(scores_wpov, player_colors)
+    ]
+
+def get_lines_per_ply(
+    move_data_list: List[MoveData],
+    analyses: Dict[str, List[Dict[str, Any]]],
+) -> Tuple[List[Optional[List[Dict[str, Any]]]], List[Optional[List[Dict[str, Any]]]]]:
+    """
+    Looks up the engine lines before and after every move once, so that per-move
+    builders index by ply instead of hashing FENs repeatedly.
+    """
+    lines_before = [analyses.get(md.fen_before_move) for md in move_data_list]
+    lines_after = [analyses.get(md.fen_after_move) for md in move_data_list]
+    return lines_before, lines_after
+
+def build_move_analysis_columns(
+    move_data_list: List[MoveData],
+    lines_before: List[Optional[List[Dict[str, Any]]]],
+    lines_after: List[Optional[List[Dict[str, Any]]]],
+    multipv_setting: int,
+) -> MoveAnalysisColumns:
+    """
+    Constructs the column-oriented input for `MoveClassifier.classify_batch`
+    from per-ply engine lines, scoring the whole game in one pass per column.
+    """
+    top_lines = [lines or [] for lines in lines_before]
+    player_colors = [md.board_before_move.turn for md in move_data_list]
+
+    best_wpov, mate_best, _ = score_lines_batch(
+        [lines[0] if lines else None for lines in top_lines], chess.WHITE
+    )
+    second_wpov, mate_second, _ = score_lines_batch(
+        [lines[1] if len(lines) > 1 else None for lines in top_lines], chess.WHITE
+    )
+    player_wpov, mate_player, _ = score_lines_batch(
+        [lines[0] if lines else None for lines in lines_after], chess.WHITE
+    )
+
+    return MoveAnalysisColumns(
+        eval_best_move=_to_player_perspective(best_wpov, player_colors), is_mate_best_move=mate_best,
+        eval_second_best_move=_to_player_perspective(second_wpov, player_colors), is_mate_second_best_move=mate_second,
+        eval_player_move=_to_player_perspective(player_wpov, player_colors), is_mate_player_move=mate_player,
+        engine_top_lines=top_lines,
+        player_move_ucis=[md.actual_move_obj.uci() for md in move_data_list],
+        player_colors=player_colors,
+        engine_multipv=multipv_setting,
+        brilliant_criteria=_BRILLIANT_CRITERIA,
+        great_criteria=_GREAT_CRITERIA,
     )
 
 def build_annotation_context(
     move_data: MoveData,
     result: ClassificationResult,
-    analyses: Dict[str, List[Dict[str, Any]]],
+    lines_before: Optional[List[Dict[str, Any]]],
+    lines_after: Optional[List[Dict[str, Any]]],
     analysis_depth: int,
     multipv_setting: int,
     prepare_comment_func: Callable[[str], Tuple[str, str]],
 ) -> AnnotationContext:
-    """Constructs the context object required by the Annotator."""
-    lines_before = analyses.get(move_data.fen_before_move, [])
-    lines_after = analyses.get(move_data.fen_after_move, [])
-
-    # Prepare formatted engine lines for the [Analyse] tag
+    """
+    Constructs the context object required by the Annotator from the engine
+    lines for the positions before and after the move.
+    """
+    # Prepare formatted engine lines for the [Analyse] tag. PV SANs are only
+    # generated if the Annotator actually reads them.
     engine_lines_info: List[EngineLineInfo] = []
     if lines_before:
-        temp_board = move_data.board_before_move.copy(stack=False)
+        # A single scratch board is shared by all lines; PV moves are pushed and popped back.
+        temp_board = move_data.materialize_board()
+        line_scores_wpov, _, line_mates_wpov = score_lines_batch(lines_before, chess.WHITE)
         for i, line in enumerate(lines_before):
-            score_wpov, _, mate_val_wpov = get_score_from_line(line, chess.WHITE)
+            score_wpov, mate_val_wpov = line_scores_wpov[i], line_mates_wpov[i]
             eval_str = f"#{mate_val_wpov}" if mate_val_wpov else f"{score_wpov/100.0:.2f}"
-            
-            pv_san_list: List[str] = []
+
+            pv_san_loader = None
             if "PV" in line:
-                pv_board = temp_board.copy(stack=False)
-                for move_uci in line.get("PV", [])[:settings.PV_MAX_MOVES_IN_COMMENT]:
-                    try:
-                        move = chess.Move.from_uci(move_uci)
-                        pv_san_list.append(pv_board.san(move))
-                        pv_board.push(move)
-                    except ValueError:
-                        pv_san_list.append(f"{move_uci}?")
-                        break
+                pv_san_loader = partial(_pv_to_san, temp_board, line.get("PV", [])[:_PV_MAX_MOVES])
             
             engine_lines_info.append(
                 EngineLineInfo(
-                    move_san=temp_board.san(chess.Move.from_uci(line["Move"])),
+                    move_san=_cached_san(temp_board, line["Move"]),
                     eval_str=eval_str,
                     is_best_line=(i == 0),
-                    pv_san_list=pv_san_list,
+                    pv_san_loader=pv_san_loader,
                 )
             )
 
@@ -169,40 +296,81 @@ def build_annotation_context(
         multipv_setting=multipv_setting,
     )
 
-def build_game_summary(
+def _get_targeted_color(
     game: chess.pgn.Game,
-    game_id: str,
     target_player: Optional[str],
-    move_results: List[ClassificationResult],
-) -> Optional[GameSummary]:
-    """Builds a GameSummary object if the game is relevant for the target player."""
+    target_player_key: Optional[str],
+) -> Optional[chess.Color]:
+    """Returns the colour played by the target player in this game, or None if they did not play it."""
     if not target_player:
         return None
+    target_key = target_player_key or target_player.casefold()
+    if target_key == game.headers.get("White", "").casefold():
+        return chess.WHITE
+    if target_key == game.headers.get("Black", "").casefold():
+        return chess.BLACK
+    return None
+
+
+def _build_summary_for_color(
+    game: chess.pgn.Game,
+    game_id: str,
+    color: chess.Color,
+    tally: PlayerMoveTally,
+) -> Optional[GameSummary]:
+    """Builds the GameSummary for the player of `color` from their tally; None if they made no moves."""
+    if not tally.cpls:
+        return None
 
-    white_player = game.headers.get("White", "")
-    black_player = game.headers.get("Black", "")
+    return GameSummary(
+        game_id=game_id,
+        analyzed_player_name=game.headers.get("White" if color else "Black", ""),
+        player_color_str="White" if color else "Black",
+        player_cpls=tally.cpls,
+        move_classification_counts=tally.classification_counts,
+        engine_top1_match_count=tally.engine_top1_match_count,
+        engine_topN_match_count=tally.engine_topN_match_count,
+        # Interned, as tags like Event and player names repeat across the summaries of a run.
+        pgn_headers={sys.intern(tag): sys.intern(value) for tag, value in game.headers.items()},
+    )
 
-    is_white_targeted = target_player.lower() == white_player.lower()
-    is_black_targeted = target_player.lower() == black_player.lower()
 
-    if not (is_white_targeted or is_black_targeted):
+def build_game_summary(
+    game: chess.pgn.Game,
+    game_id: str,
+    target_player: Optional[str],
+    move_results: List[ClassificationResult],
+    target_player_key: Optional[str] = None,
+) -> Optional[GameSummary]:
+    """
+    Builds a GameSummary object if the game is relevant for the target player.
+    Callers summarizing many games can pass `target_player_key`, the target
+    name already casefolded, to avoid folding it again for every game.
+    """
+    color = _get_targeted_color(game, target_player, target_player_key)
+    if color is None:
         return None
 
-    # Filter results for the targeted player based on move index (even for White, odd for Black)
-    player_results = [r for i, r in enumerate(move_results) if (is_white_targeted and i % 2 == 0) or (is_black_targeted and i % 2 != 0)]
+    # Only the targeted player's moves are tallied (even plies for White, odd for Black).
+    stride = 0 if color == chess.WHITE else 1
+    player_results = move_results[stride::2]
     if not player_results:
         return None
+    tally = PlayerMoveTally()
+    for result in player_results:
+        tally.add(result)
+    return _build_summary_for_color(game, game_id, color, tally)
 
-    # Simplify classification text for counting (e.g., "Good (CPL: 30)" -> "Good")
-    classification_names = [r.classification_text.split("(")[0].strip() for r in player_results]
 
-    return GameSummary(
-        game_id=game_id,
-        analyzed_player_name=white_player if is_white_targeted else black_player,
-        player_color_str="White" if is_white_targeted else "Black",
-        player_cpls=[r.cpl for r in player_results],
-        move_classification_counts=Counter(classification_names),
-        engine_top1_match_count=sum(1 for r in player_results if r.is_engine_top_choice),
-        engine_topN_match_count=sum(1 for r in player_results if r.is_engine_top_n_choice),
-        pgn_headers=dict(game.headers),
-    )
\ No newline at end of file
+def build_game_summary_from_tallies(
+    game: chess.pgn.Game,
+    game_id: str,
+    target_player: Optional[str],
+    tallies: Tuple[PlayerMoveTally, PlayerMoveTally],
+    target_player_key: Optional[str] = None,
+) -> Optional[GameSummary]:
+    """Builds a GameSummary from (white, black) tallies accumulated while processing the game."""
+    color = _get_targeted_color(game, target_player, target_player_key)
+    if color is None:
+        return None
+    return _build_summary_for_color(game, game_id, color, tallies[0 if color else 1])
@@ -9,7 +9,7 @@ from subprocess import Popen
 class StockfishException(Exception): ...
 
 class Stockfish:
-    _subprocess: Optional[Popen[str]]
+    _stockfish: Popen[str]
     
     def __init__(
         self,
@@ -23,4 +23,5 @@ class Stockfish:
     def set_fen_position(self, fen_position: str, send_ucinewgame: bool = True) -> None: ...
     def set_depth(self, depth: int) -> None: ...
     def get_top_moves(self, num_top_moves: int) -> Optional[List[Dict[str, Union[str, int]]]]: ...
+    def get_parameters(self) -> Dict[str, Any]: ...
     def update_engine_parameters(self, parameters: Dict[str, Any]) -> None: ...
\ No newline at end of file
@@ -9,8 +9,11 @@ robust process management.
 """
 import logging
 import os
+import re
+import subprocess
 import threading
-from typing import Any, Dict, List, Optional, Callable
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Callable, Tuple
 
 import chess
 from stockfish import Stockfish, StockfishException
@@ -26,6 +29,25 @@ from chess_analyzer.exceptions import (
 logger = logging.getLogger(settings.APP_NAME + ".StockfishController")
 
 
+# Extracts the MultiPV index, score and first PV move from a UCI 'info' line.
+_INFO_LINE_RE = re.compile(
+    r"\bmultipv (?P<multipv>\d+)\b.*?\bscore (?P<kind>cp|mate) (?P<value>-?\d+)"
+    r"(?P<bound> (?:lower|upper)bound)?.*?\bpv (?P<move>\S+)"
+)
+
+# Captures the four position fields of a FEN (placement, turn, castling, en passant).
+_FEN_POSITION_RE = re.compile(r"^(\S+\s+\S+\s+\S+\s+\S+)(?:\s+\d+\s+\d+)?$")
+
+
+def _normalize_fen(fen: str) -> str:
+    """
+    Strips the halfmove clock and fullmove number from a FEN, so that positions
+    differing only in move counters share a memo entry.
+    """
+    match = _FEN_POSITION_RE.match(fen)
+    return match.group(1) if match else fen
+
+
 class StockfishController:
     """
     Controls and interacts with a Stockfish chess engine instance.
@@ -44,7 +66,8 @@ class StockfishController:
         Args:
             path: Absolute or relative path to the Stockfish executable.
             depth: Analysis depth for Stockfish.
-            **kwargs: Can include 'stockfish_threads', 'stockfish_hash_mb', 'multipv_count'.
+            **kwargs: Can include 'stockfish_threads', 'stockfish_hash_mb', 'multipv_count',
+                      'memo_cache_size'.
         """
         self.stockfish_path: str = os.path.realpath(path)
         self.analysis_depth: int = depth
@@ -59,6 +82,13 @@ class StockfishController:
         self._stockfish: Optional[Stockfish] = None
         self._stockfish_version: str = settings.STOCKFISH_VERSION_UNKNOWN
         self._is_closed: bool = False
+        # Set while pipelined searches may still be queued in the engine; the next
+        # batch then resets the engine over UCI before reusing it.
+        self._needs_soft_reset: bool = False
+
+        # In-process LRU of recent analyses, keyed by (normalized fen, depth, multipv).
+        self._memo: OrderedDict[Tuple[str, int, int], List[Dict[str, Any]]] = OrderedDict()
+        self._memo_capacity: int = kwargs.get('memo_cache_size', settings.ENGINE_MEMO_CACHE_SIZE)
 
         self._initialize_engine()
         logger.info(
@@ -103,6 +133,7 @@ class StockfishController:
         
         try:
             self._stockfish = self._create_and_verify_engine_instance()
+            self._needs_soft_reset = False
             logger.info(f"Stockfish engine (Version: {self._stockfish_version}) initialized successfully.")
         except StockfishInitializationError:
             self._stockfish = None
@@ -113,24 +144,160 @@ class StockfishController:
         return self._stockfish_version
 
     def is_ready(self) -> bool:
-        """Checks if the Stockfish engine instance is initialized and responsive."""
+        """
+        Checks if the Stockfish engine instance is initialized and responsive.
+        An unresponsive engine process is stopped and re-initialized on next use.
+        """
         if self._is_closed or self._stockfish is None:
             return False
-        try:
-            return self._stockfish.is_fen_valid(chess.STARTING_FEN)
-        except StockfishException:
+        return self._send_and_await_readyok("isready\n")
+
+    @staticmethod
+    def _await_readyok(proc: subprocess.Popen, timeout: float) -> bool:
+        """
+        Discards engine output up to the next 'readyok', giving up after `timeout` seconds.
+
+        The read happens on a helper thread so a hung engine cannot block the caller.
+        Contract: when this returns False the caller must stop the process, because
+        the thread keeps reading stdout until EOF and would otherwise race later reads.
+        """
+        assert proc.stdout is not None
+        stdout = proc.stdout
+        got_readyok = threading.Event()
+
+        def drain() -> None:
+            try:
+                for text in iter(stdout.readline, ""):
+                    if text.strip() == "readyok":
+                        got_readyok.set()
+                        return
+            except (OSError, ValueError):
+                pass
+
+        reader = threading.Thread(target=drain, name="StockfishReadyWait", daemon=True)
+        reader.start()
+        reader.join(timeout)
+        return got_readyok.is_set()
+
+    def _send_and_await_readyok(self, commands: str) -> bool:
+        """
+        Sends UCI commands ending in 'isready' and waits for the engine's 'readyok'.
+        If the engine does not answer, its process is stopped and discarded, as
+        `_await_readyok` requires, and False is returned.
+        """
+        assert self._stockfish is not None
+        proc = self._stockfish._stockfish
+        if proc.poll() is None:
+            try:
+                assert proc.stdin is not None
+                proc.stdin.write(commands)
+                proc.stdin.flush()
+                if self._await_readyok(proc, settings.ENGINE_READY_TIMEOUT_S):
+                    return True
+            except OSError:
+                pass
+        logger.warning("Stockfish engine not responding. Stopping the engine process.")
+        self._stop_engine_process(proc)
+        self._stockfish = None
+        return False
+
+    def _soft_reset(self) -> bool:
+        """
+        Stops any queued searches and starts a new game on the running engine,
+        avoiding a process restart. Returns False if the engine did not respond.
+        """
+        logger.debug("Soft-resetting Stockfish engine with 'ucinewgame'.")
+        if not self._send_and_await_readyok("stop\nucinewgame\nisready\n"):
             return False
+        self._needs_soft_reset = False
+        return True
 
     def _ensure_engine_ready(self) -> None:
-        """Ensures the Stockfish engine is initialized, re-initializing if needed."""
+        """
+        Ensures the Stockfish engine is initialized and responsive. An engine left in
+        an unknown state by a failed batch is soft-reset first; the process is only
+        restarted if it does not respond.
+        """
         if self._is_closed:
             raise StockfishError("Operation on a closed StockfishController.")
-        if not self.is_ready():
-            logger.warning("Stockfish engine not ready. Attempting re-initialization.")
-            try:
-                self._initialize_engine()
-            except StockfishInitializationError as e:
-                raise StockfishError("Fatal: Failed to re-initialize Stockfish.") from e
+        if self._stockfish is not None:
+            # An unresponsive engine has already been stopped by the readiness check.
+            responsive = self._soft_reset() if self._needs_soft_reset else self.is_ready()
+            if responsive:
+                return
+        logger.warning("Stockfish engine not ready. Attempting re-initialization.")
+        try:
+            self._initialize_engine()
+        except StockfishInitializationError as e:
+            raise StockfishError("Fatal: Failed to re-initialize Stockfish.") from e
+
+    def _is_fen_valid(self, fen: str) -> bool:
+        """
+        Validates a FEN locally with python-chess. The engine's own check (which
+        starts a temporary Stockfish process) is only used when the local check rejects it.
+        """
+        try:
+            if chess.Board(fen).is_valid():
+                return True
+        except ValueError:
+            pass
+        assert self._stockfish is not None
+        return self._stockfish.is_fen_valid(fen)
+
+    def _remember_analysis(self, key: Tuple[str, int, int], analysis: List[Dict[str, Any]]) -> None:
+        """Stores an analysis in the memo, evicting the least recently used entry when full."""
+        if self._memo_capacity <= 0:
+            return
+        self._memo[key] = analysis
+        if len(self._memo) > self._memo_capacity:
+            self._memo.popitem(last=False)
+
+    def _ensure_multipv(self, num_lines: int) -> None:
+        """Sets the engine's MultiPV option once, if it differs from what a batch needs."""
+        assert self._stockfish is not None
+        if self._stockfish.get_parameters().get("MultiPV") != num_lines:
+            self._stockfish.update_engine_parameters({"MultiPV": num_lines})
+
+    @staticmethod
+    def _read_engine_line(proc: subprocess.Popen) -> str:
+        """Reads one line of engine output, raising if the process has gone away."""
+        assert proc.stdout is not None
+        text = proc.stdout.readline()
+        if not text:
+            raise StockfishException("The Stockfish process has crashed")
+        return text.strip()
+
+    def _read_top_moves(self, proc: subprocess.Popen, fen: str, num_lines: int) -> List[Dict[str, Any]]:
+        """
+        Consumes the engine output of one search up to its 'bestmove' line, returning
+        the top lines in the same format as `Stockfish.get_top_moves` (White's POV).
+        """
+        # Later info lines supersede earlier ones, so the last seen entry per
+        # MultiPV index belongs to the deepest completed iteration.
+        latest_lines: Dict[int, Dict[str, Any]] = {}
+        multiplier = -1 if fen.partition(" ")[2].startswith("b") else 1
+
+        while True:
+            text = self._read_engine_line(proc)
+            if text.startswith("bestmove"):
+                if text.startswith("bestmove (none)"):
+                    return []
+                break
+            match = _INFO_LINE_RE.search(text)
+            if not match or match.group("bound"):
+                continue
+            multipv = int(match.group("multipv"))
+            if multipv > num_lines:
+                continue
+            value = int(match.group("value")) * multiplier
+            is_mate = match.group("kind") == "mate"
+            latest_lines[multipv] = {
+                "Move": match.group("move"),
+                "Centipawn": None if is_mate else value,
+                "Mate": value if is_mate else None,
+            }
+
+        return [latest_lines[k] for k in sorted(latest_lines)]
 
     def analyze_fens_batch(
         self,
@@ -140,7 +307,15 @@ class StockfishController:
     ) -> Dict[str, Optional[List[Dict[str, Any]]]]:
         """
         Analyzes a list of FEN positions, returning a map of FEN to analysis results.
-        
+
+        Duplicate FENs are analyzed once, and positions seen in recent batches are
+        served from an in-process memo without touching the engine. The remaining
+        positions are sent to the engine in pipelined chunks of 'position'/'go'
+        commands, so the engine never waits on Python between searches.
+
+        Every input FEN has an entry in the result; invalid FENs, and FENs left
+        unanalyzed because of a shutdown signal, map to None.
+
         Args:
             fen_list: A list of FEN strings to analyze.
             shutdown_event: An event to signal for early shutdown.
@@ -149,60 +324,102 @@ class StockfishController:
         self._ensure_engine_ready()
         assert self._stockfish is not None, "Engine should be ready after _ensure_engine_ready"
 
-        results: Dict[str, Optional[List[Dict[str, Any]]]] = {}
-        if not fen_list:
+        # Preallocated with one slot per unique FEN; only the values are filled in below.
+        results: Dict[str, Optional[List[Dict[str, Any]]]] = dict.fromkeys(fen_list)
+        if not results:
             return results
 
-        logger.debug(f"Starting Stockfish batch analysis of {len(fen_list)} FENs.")
+        logger.debug(f"Starting Stockfish batch analysis of {len(results)} unique FENs.")
         
         num_moves_to_get = max(1, self.multipv_count)
-        
-        for fen in fen_list:
-            if shutdown_event and shutdown_event.is_set():
-                logger.warning("Batch analysis interrupted by shutdown signal.")
-                break
-            
-            try:
-                if not self._stockfish.is_fen_valid(fen):
+        proc = self._stockfish._stockfish
+        current_fen = ""
+
+        try:
+            # Pass 1: serve memo hits and weed out invalid positions.
+            to_search: List[Tuple[str, Tuple[str, int, int]]] = []
+            for fen in results:
+                if shutdown_event and shutdown_event.is_set():
+                    logger.warning("Batch analysis interrupted by shutdown signal.")
+                    return results
+
+                current_fen = fen
+                memo_key = (_normalize_fen(fen), self.analysis_depth, num_moves_to_get)
+                memoized = self._memo.get(memo_key)
+                if memoized is not None:
+                    self._memo.move_to_end(memo_key)
+                    results[fen] = memoized
+                elif not self._is_fen_valid(fen):
+                    # Its result stays None.
                     logger.warning(f"Invalid FEN provided for analysis, skipping: {fen}")
-                    results[fen] = None
+                else:
+                    to_search.append((fen, memo_key))
                     continue
-
-                self._stockfish.set_fen_position(fen)
-                top_moves = self._stockfish.get_top_moves(num_moves_to_get)
-                results[fen] = top_moves
-            except StockfishException as e:
-                logger.error(f"Stockfish process error on FEN '{fen}'. Aborting batch.", exc_info=True)
-                self._stockfish = None
-                raise StockfishAnalysisError(f"Stockfish engine failed on FEN '{fen}'.") from e
-            finally:
                 if progress_callback:
                     progress_callback()
+
+            # Pass 2: pipeline the searches, one chunk of commands at a time.
+            self._ensure_multipv(num_moves_to_get)
+            chunk_size = max(1, settings.ENGINE_PIPELINE_CHUNK_SIZE)
+            for chunk_start in range(0, len(to_search), chunk_size):
+                if shutdown_event and shutdown_event.is_set():
+                    logger.warning("Batch analysis interrupted by shutdown signal.")
+                    break
+
+                chunk = to_search[chunk_start:chunk_start + chunk_size]
+                assert proc.stdin is not None
+                self._needs_soft_reset = True
+                proc.stdin.write("".join(
+                    f"position fen {fen}\ngo depth {self.analysis_depth}\n" for fen, _ in chunk
+                ))
+                proc.stdin.flush()
+
+                for fen, memo_key in chunk:
+                    current_fen = fen
+                    top_moves = self._read_top_moves(proc, fen, num_moves_to_get)
+                    results[fen] = top_moves
+                    self._remember_analysis(memo_key, top_moves)
+                    if progress_callback:
+                        progress_callback()
+                self._needs_soft_reset = False
+        except (StockfishException, OSError) as e:
+            logger.error(f"Stockfish process error on FEN '{current_fen}'. Aborting batch.", exc_info=True)
+            self._needs_soft_reset = True
+            raise StockfishAnalysisError(f"Stockfish engine failed on FEN '{current_fen}'.") from e
         
         logger.debug(f"Stockfish batch analysis finished for {len(results)} FENs.")
         return results
 
+    @staticmethod
+    def _stop_engine_process(proc: subprocess.Popen) -> None:
+        """Asks the engine to quit over UCI, killing the process if it does not exit promptly."""
+        if proc.poll() is not None:
+            logger.debug("Stockfish process was already gone.")
+            return
+        try:
+            assert proc.stdin is not None
+            proc.stdin.write("quit\n")
+            proc.stdin.flush()
+            proc.wait(timeout=settings.ENGINE_QUIT_TIMEOUT_S)
+            logger.debug("Stockfish process exited.")
+        except OSError:
+            logger.debug("Stockfish process was already gone.")
+        except subprocess.TimeoutExpired:
+            logger.warning("Stockfish process did not quit gracefully, killing it.")
+            proc.kill()
+            try:
+                proc.wait(timeout=settings.ENGINE_QUIT_TIMEOUT_S)
+            except subprocess.TimeoutExpired:
+                logger.error("Stockfish process could not be killed.")
+
     def close(self) -> None:
         """Properly terminates the Stockfish engine process and closes the controller."""
         if self._is_closed:
             return
         
         logger.info("Closing StockfishController and terminating engine process...")
-        if self._stockfish and hasattr(self._stockfish, '_subprocess'):
-            proc = self._stockfish._subprocess
-            if proc and proc.poll() is None:
-                try:
-                    proc.terminate()
-                    proc.wait(timeout=2.0)
-                    logger.debug("Stockfish process terminated.")
-                except ProcessLookupError:
-                    logger.debug("Stockfish process was already gone.")
-                except TimeoutError:
-                    logger.warning("Stockfish process did not terminate gracefully, killing it.")
-                    proc.kill()
-                    proc.wait(timeout=1.0)
-                except Exception as e:
-                    logger.error(f"Exception during Stockfish process termination: {e}", exc_info=True)
+        if self._stockfish:
+            self._stop_engine_process(self._stockfish._stockfish)
 
         self._stockfish = None
         self._is_closed = True
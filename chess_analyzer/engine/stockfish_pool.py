@@ -0,0 +1,190 @@
+# chess_analyzer_project/chess_analyzer/engine/stockfish_pool.py
+"""
+Runs several Stockfish engines in parallel.
+
+This module provides a pool of `StockfishController` workers, each owning
+its own single-threaded engine process. FEN batches are sharded across the
+workers so that batch analysis scales with the number of available cores.
+"""
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from chess_analyzer.config import settings
+from chess_analyzer.engine.stockfish_controller import StockfishController
+from chess_analyzer.exceptions import StockfishError, StockfishAnalysisError
+
+logger = logging.getLogger(settings.APP_NAME + ".StockfishPool")
+
+# Event kinds posted by workers onto the shared result queue.
+_EVENT_PROGRESS = "progress"
+_EVENT_DONE = "done"
+_EVENT_FAILED = "failed"
+
+
+class StockfishPool:
+    """
+    Shards FEN analysis across a pool of `StockfishController` workers.
+
+    Each worker drives its own engine process with `Threads=1`, so the engine
+    search runs in parallel while the Python side only dispatches work and
+    collects results. The pool exposes the same interface as
+    `StockfishController` and is a context manager.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        depth: int = settings.DEFAULT_ANALYSIS_DEPTH,
+        num_workers: Optional[int] = None,
+        **kwargs
+    ):
+        """
+        Initializes the pool and starts one engine process per worker.
+
+        Args:
+            path: Absolute or relative path to the Stockfish executable.
+            depth: Analysis depth for Stockfish.
+            num_workers: Number of engine processes. None or 0 means one per CPU core.
+            **kwargs: Same options as `StockfishController`. 'stockfish_hash_mb'
+                      is the total hash budget, split evenly across workers.
+        """
+        if num_workers is not None and num_workers < 0:
+            raise ValueError(f"num_workers must be 0 (one per CPU core) or positive, got {num_workers}.")
+        self.num_workers: int = num_workers or os.cpu_count() or 1
+        total_hash_mb = kwargs.get('stockfish_hash_mb', settings.DEFAULT_STOCKFISH_HASH_MB)
+
+        worker_kwargs = dict(kwargs)
+        worker_kwargs['stockfish_threads'] = 1
+        worker_kwargs['stockfish_hash_mb'] = max(
+            settings.MIN_STOCKFISH_HASH_MB_PER_WORKER, total_hash_mb // self.num_workers
+        )
+
+        self._controllers: List[StockfishController] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._is_closed: bool = False
+
+        try:
+            for _ in range(self.num_workers):
+                self._controllers.append(StockfishController(path=path, depth=depth, **worker_kwargs))
+        except StockfishError:
+            self.close()
+            raise
+
+        self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="StockfishWorker")
+        logger.info(
+            f"StockfishPool initialized with {self.num_workers} workers "
+            f"(Hash per worker: {worker_kwargs['stockfish_hash_mb']} MB)."
+        )
+
+    def get_stockfish_version(self) -> str:
+        if not self._controllers:
+            return settings.STOCKFISH_VERSION_UNKNOWN
+        return self._controllers[0].get_stockfish_version()
+
+    def is_ready(self) -> bool:
+        """Checks if every engine in the pool is initialized and responsive."""
+        if self._is_closed or not self._controllers:
+            return False
+        return all(controller.is_ready() for controller in self._controllers)
+
+    @staticmethod
+    def _run_shard(
+        controller: StockfishController,
+        shard: List[str],
+        shutdown_event: Optional[threading.Event],
+        events: "queue.Queue[Tuple[str, Any]]",
+    ) -> None:
+        """Analyzes one shard on a worker thread, posting progress and results to the queue."""
+        try:
+            shard_results = controller.analyze_fens_batch(
+                shard,
+                shutdown_event=shutdown_event,
+                progress_callback=lambda: events.put((_EVENT_PROGRESS, None)),
+            )
+            events.put((_EVENT_DONE, shard_results))
+        except Exception as e:
+            events.put((_EVENT_FAILED, e))
+
+    def analyze_fens_batch(
+        self,
+        fen_list: List[str],
+        shutdown_event: Optional[threading.Event] = None,
+        progress_callback: Optional[Callable[[], None]] = None,
+    ) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+        """
+        Analyzes a list of FEN positions in parallel, returning a map of FEN to analysis results.
+
+        Unique FENs are distributed round-robin across the workers. The progress callback
+        is only ever invoked from the calling thread. As with `StockfishController`, FENs
+        that were not analyzed map to None.
+
+        Args:
+            fen_list: A list of FEN strings to analyze.
+            shutdown_event: An event to signal for early shutdown, shared by all workers.
+            progress_callback: An optional callable that will be called after each FEN is analyzed.
+        """
+        if self._is_closed or self._executor is None:
+            raise StockfishError("Operation on a closed StockfishPool.")
+
+        # Preallocated with one slot per unique FEN, which also deduplicates
+        # before sharding so repeated positions never land on two workers.
+        results: Dict[str, Optional[List[Dict[str, Any]]]] = dict.fromkeys(fen_list)
+        if not results:
+            return results
+
+        unique_fens = list(results)
+        logger.debug(f"Dispatching {len(unique_fens)} unique FENs across {self.num_workers} workers.")
+
+        events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        pending = 0
+        for worker_index, controller in enumerate(self._controllers):
+            shard = unique_fens[worker_index::self.num_workers]
+            if shard:
+                self._executor.submit(self._run_shard, controller, shard, shutdown_event, events)
+                pending += 1
+
+        first_error: Optional[Exception] = None
+        while pending:
+            kind, payload = events.get()
+            if kind == _EVENT_PROGRESS:
+                if progress_callback:
+                    progress_callback()
+            elif kind == _EVENT_DONE:
+                results.update(payload)
+                pending -= 1
+            else:
+                first_error = first_error or payload
+                pending -= 1
+
+        if first_error is not None:
+            if isinstance(first_error, StockfishError):
+                raise first_error
+            raise StockfishAnalysisError(f"Stockfish worker failed: {first_error}") from first_error
+
+        logger.debug(f"Parallel batch analysis finished for {len(results)} FENs.")
+        return results
+
+    def close(self) -> None:
+        """Terminates all engine processes and shuts down the worker threads."""
+        if self._is_closed:
+            return
+
+        logger.info(f"Closing StockfishPool ({len(self._controllers)} workers)...")
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for controller in self._controllers:
+            controller.close()
+
+        self._is_closed = True
+        logger.info("StockfishPool closed.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
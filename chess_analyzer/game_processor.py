@@ -17,11 +17,15 @@ from chess_analyzer.pgn.pgn_handler import PGNHandler
 from chess_analyzer.analysis.move_classifier import MoveClassifier
 from chess_analyzer.analysis.annotator import Annotator
 from chess_analyzer.types import (
+    BoardSnapshot,
     ProcessedGameResult,
     ClassificationResult,
+    MoveData,
+    PlayerMoveTally,
     ProgressReporter,
 )
 import chess_analyzer.context_builders as builders
+from chess_analyzer.utils.chess_utils import get_material_diff, get_material_diffs_for_move
 from chess_analyzer.exceptions import StockfishError, CacheError, PGNError
 
 logger = logging.getLogger(__name__.split('.')[0] + ".GameProcessor")
@@ -51,8 +55,18 @@ class GameProcessor:
         self.analysis_provider = analysis_provider
         self.move_classifier = move_classifier
         self.annotator = annotator
+        # Casefolded target player name, cached across games of a run.
+        self._target_player: Optional[str] = None
+        self._target_player_key: Optional[str] = None
         logger.debug("GameProcessor initialized.")
 
+    def _get_target_player_key(self, target_player: Optional[str]) -> Optional[str]:
+        """Returns the casefolded target player name, folding it only when it changes."""
+        if target_player != self._target_player:
+            self._target_player = target_player
+            self._target_player_key = target_player.casefold() if target_player else None
+        return self._target_player_key
+
     def process_game(
         self,
         game: chess.pgn.Game,
@@ -64,44 +78,68 @@ class GameProcessor:
         """
         game_id = self.pgn_handler.extract_game_id(game.headers) or "N/A"
 
-        # Step 1: Delegate ALL data fetching to the new provider.
-        # This one call replaces a large block of complex logic.
-        all_analyses, cache_hits, engine_runs = self.analysis_provider.get_analyses_for_game(
-            game, progress
-        )
-        
-        # Step 2: Extract move data (this is a simple, fast operation)
-        move_data_list, _ = self.pgn_handler.collect_move_data_and_fens(game)
+        # Step 1: Extract move data and the game's unique positions (a simple, fast operation)
+        move_data_list, game_unique_fens = self.pgn_handler.collect_move_data_and_fens(game)
 
         if not move_data_list:
             logger.info(f"Game {game_id} has no moves to process.")
             return ProcessedGameResult(annotated_game=game, summary=None), 0, 0
+
+        # Step 2: Delegate ALL data fetching to the provider.
+        all_analyses, cache_hits, engine_runs = self.analysis_provider.get_analyses_for_game(
+            game, progress, required_fens=game_unique_fens
+        )
         
         # --- The GameProcessor's CORE responsibility: move-by-move workflow ---
-        all_classification_results: List[ClassificationResult] = []
-        for move_data in move_data_list:
-            move_context = builders.build_move_analysis_context(move_data, all_analyses, self.multipv_count)
-            class_result = self.move_classifier.classify_move(move_context)
-            all_classification_results.append(class_result)
-            
+        # Classify the whole game from column-oriented evals; material is only
+        # counted for moves that might be sacrifices.
+        lines_before, lines_after = builders.get_lines_per_ply(move_data_list, all_analyses)
+        columns = builders.build_move_analysis_columns(move_data_list, lines_before, lines_after, self.multipv_count)
+        all_classification_results: List[ClassificationResult] = self.move_classifier.classify_batch(
+            columns, get_material_diffs=lambda i: self._material_diffs_for_move(move_data_list[i])
+        )
+
+        # Annotate each move and tally per-colour statistics in the same pass.
+        tallies = (PlayerMoveTally(), PlayerMoveTally())
+        for i, (move_data, class_result) in enumerate(zip(move_data_list, all_classification_results)):
             annotation_context = builders.build_annotation_context(
-                move_data=move_data, result=class_result, analyses=all_analyses,
+                move_data=move_data, result=class_result,
+                lines_before=lines_before[i], lines_after=lines_after[i],
                 analysis_depth=self.analysis_depth, multipv_setting=self.multipv_count,
                 prepare_comment_func=self.annotator.prepare_context_from_existing_comment
             )
             move_data.pgn_node.comment = self.annotator.generate_pgn_node_comment(annotation_context)
-            
+            # White moves on even plies, Black on odd plies.
+            tallies[i & 1].add(class_result)
+
         # Step 3: Finalize the results
-        game_summary = builders.build_game_summary(game, game_id, target_player, all_classification_results)
-        self._add_final_pgn_headers(game, all_classification_results)
+        game_summary = builders.build_game_summary_from_tallies(
+            game, game_id, target_player, tallies,
+            target_player_key=self._get_target_player_key(target_player),
+        )
+        self._add_final_pgn_headers(game, tallies)
         result = ProcessedGameResult(annotated_game=game, summary=game_summary)
         
         return result, cache_hits, engine_runs
 
-    def _add_final_pgn_headers(self, game: chess.pgn.Game, results: List[ClassificationResult]):
+    @staticmethod
+    def _material_diffs_for_move(move_data: MoveData) -> Tuple[float, float]:
+        """
+        Returns the mover's material difference before and after a move. Standard
+        positions are read from the snapshot's bitboards without building a board.
+        """
+        if isinstance(move_data.board_before_move, BoardSnapshot):
+            return get_material_diffs_for_move(move_data.board_before_move, move_data.actual_move_obj)
+
+        # Variant rules (e.g. drops) can change material in other ways; play the move out.
+        board_before = move_data.materialize_board()
+        board_after = board_before.copy(stack=False)
+        board_after.push(move_data.actual_move_obj)
+        player_color = board_before.turn
+        return get_material_diff(board_before, player_color), get_material_diff(board_after, player_color)
+
+    def _add_final_pgn_headers(self, game: chess.pgn.Game, tallies: Tuple[PlayerMoveTally, PlayerMoveTally]):
         """Adds calculated ACPL values to the game headers."""
-        white_cpls = [r.cpl for i, r in enumerate(results) if i % 2 == 0]
-        black_cpls = [r.cpl for i, r in enumerate(results) if i % 2 != 0]
-        
-        game.headers["WhiteACPL"] = f"{sum(white_cpls) / len(white_cpls):.1f}" if white_cpls else "0.0"
-        game.headers["BlackACPL"] = f"{sum(black_cpls) / len(black_cpls):.1f}" if black_cpls else "0.0"
\ No newline at end of file
+        white_tally, black_tally = tallies
+        game.headers["WhiteACPL"] = f"{white_tally.acpl:.1f}"
+        game.headers["BlackACPL"] = f"{black_tally.acpl:.1f}"
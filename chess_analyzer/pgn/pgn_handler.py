@@ -9,30 +9,102 @@ resilient to common errors in PGN files.
 import logging
 import os
 import re
+import sys
 import threading
-from collections import OrderedDict
-from typing import IO, Dict, Generator, List, Optional, Set, Tuple
+from itertools import chain
+from operator import attrgetter
+from typing import IO, Any, Callable, Dict, Generator, List, Optional, Set, Tuple
 
 import chess
 import chess.pgn
 
 from chess_analyzer.config import settings
-from chess_analyzer.types import MoveData
+from chess_analyzer.types import BoardSnapshot, MoveData
 # Import exceptions from the central location
 from chess_analyzer.exceptions import PGNError, PGNImportError, PGNExportError
 
 logger = logging.getLogger(settings.APP_NAME + ".PGNHandler")
 
+# FEN castling field for each cleaned standard-chess castling-rights bitmask seen so far.
+# Keyed on `clean_castling_rights()`, since a setup position may carry rights that do not
+# match its rooks and king, and `castling_xfen()` leaves those out.
+_CASTLING_FEN_CACHE: Dict[int, str] = {}
+
+
+def _position_fen(board: chess.Board) -> str:
+    """
+    Returns the same string as `board.fen()`. For standard chess it is built straight
+    from the piece bitboards, which avoids creating a `Piece` per square; variant and
+    Chess960 boards fall back to `board.fen()`.
+    """
+    if type(board) is not chess.Board or board.chess960:
+        return board.fen()
+
+    cells = ["1"] * 64
+    occupied_white = board.occupied_co[chess.WHITE]
+    occupied_black = board.occupied_co[chess.BLACK]
+    for bitboard, white_symbol, black_symbol in (
+        (board.pawns, "P", "p"), (board.knights, "N", "n"), (board.bishops, "B", "b"),
+        (board.rooks, "R", "r"), (board.queens, "Q", "q"), (board.kings, "K", "k"),
+    ):
+        for square in chess.scan_forward(bitboard & occupied_white):
+            cells[square] = white_symbol
+        for square in chess.scan_forward(bitboard & occupied_black):
+            cells[square] = black_symbol
+    placement = "/".join(["".join(cells[rank_start:rank_start + 8]) for rank_start in range(56, -1, -8)])
+    # Collapse runs of empty squares, longest first ("11111111" -> "8").
+    for run_length in range(8, 1, -1):
+        run = "1" * run_length
+        if run in placement:
+            placement = placement.replace(run, str(run_length))
+
+    castling_rights = board.clean_castling_rights()
+    castling = _CASTLING_FEN_CACHE.get(castling_rights)
+    if castling is None:
+        castling = _CASTLING_FEN_CACHE[castling_rights] = board.castling_xfen()
+
+    ep_square = board.ep_square
+    en_passant = chess.SQUARE_NAMES[ep_square] if ep_square is not None and board.has_legal_en_passant() else "-"
+
+    return (
+        f"{placement} {'w' if board.turn else 'b'} {castling} {en_passant} "
+        f"{board.halfmove_clock} {board.fullmove_number}"
+    )
+
+
+class _SkippingGameBuilder(chess.pgn.GameBuilder):
+    """
+    Builds games like `chess.pgn.GameBuilder`, but stops after the headers of a game
+    whose ID is to be skipped, so its move text is never parsed.
+    """
+
+    def __init__(self, extract_game_id: Callable[[chess.pgn.Headers], Optional[str]], skip_ids: Set[str]):
+        super().__init__()
+        self._extract_game_id = extract_game_id
+        self._skip_ids = skip_ids
+        self.skipped: bool = False
+
+    def end_headers(self) -> Optional[chess.pgn.SkipType]:
+        if self._extract_game_id(self.game.headers) in self._skip_ids:
+            self.skipped = True
+            return chess.pgn.SKIP
+        return None
+
 
 class PGNHandler:
     """Provides functionalities to read, process, and write PGN files."""
     
-    _GAME_ID_EXTRACTION_PATTERNS: Dict[str, str] = OrderedDict([
-        ("SiteLichess", r"lichess\.org/([a-zA-Z0-9]{8,12})"),
-        ("SiteChessCom", r"chess\.com/game/live/([0-9]+)"),
-        ("SiteChessComAnalysis", r"chess\.com/analysis/game/live/([0-9]+)"),
-        ("LichessURL", r"lichess\.org/([a-zA-Z0-9]{8,12})"),
-    ])
+    # Starts the processed game ID index lines that stamp the output PGN's size and mtime.
+    _IDS_INDEX_STAMP_PREFIX: str = "#output "
+    # Header tags that may hold a game URL, in priority order.
+    _GAME_ID_URL_TAGS: Tuple[str, ...] = ("Site", "LichessURL")
+    # Lichess and Chess.com (live game or analysis) URLs, matched in a single search.
+    # A str.find/partition parser with the same semantics was measured slower than this
+    # one C-level search, since it has to scan the ID characters in Python.
+    _GAME_ID_RE: "re.Pattern[str]" = re.compile(
+        r"lichess\.org/(?P<lichess>[a-zA-Z0-9]{8,12})"
+        r"|chess\.com/(?:analysis/)?game/live/(?P<chesscom>[0-9]+)"
+    )
 
     def __init__(self, pgn_output_columns: int = settings.PGN_DEFAULT_COLUMNS):
         """
@@ -43,7 +115,15 @@ class PGNHandler:
                                 output PGN files. 0 means no wrapping.
         """
         self.pgn_output_columns: int = pgn_output_columns
-        self._is_first_export_to_handle: Dict[int, bool] = {}
+        self._exporter_options: Dict[str, Any] = {
+            "headers": True, "variations": True, "comments": True,
+            "columns": pgn_output_columns if pgn_output_columns > 0 else None,
+        }
+        # Reused for every game written to the same output handle.
+        self._exporter: Optional[chess.pgn.FileExporter] = None
+        # Game ID indexes known to list every game in their output PGN. Only these are
+        # stamped by `flush_exports`; any other index is rescanned on the next run.
+        self._complete_index_paths: Set[str] = set()
 
     def extract_game_id(self, headers: chess.pgn.Headers) -> Optional[str]:
         """
@@ -51,25 +131,65 @@ class PGNHandler:
 
         Prioritizes Lichess and Chess.com URLs, then falls back to the 'GameId' tag.
         """
-        for tag_name in ["Site", "LichessURL"]:
+        for tag_name in self._GAME_ID_URL_TAGS:
             header_value = headers.get(tag_name)
-            if header_value:
-                for pattern in self._GAME_ID_EXTRACTION_PATTERNS.values():
-                    match = re.search(pattern, header_value)
-                    if match:
-                        return match.group(1)
+            # Cheap substring checks first; values like "?" or an event venue never reach the regex.
+            if header_value and ("lichess.org/" in header_value or "chess.com/" in header_value):
+                match = self._GAME_ID_RE.search(header_value)
+                if match:
+                    return match.group("lichess") or match.group("chesscom")
         
         game_id_tag = headers.get("GameId")
         return game_id_tag if game_id_tag and game_id_tag != "?" else None
 
+    @staticmethod
+    def get_processed_ids_index_path(output_pgn_path: str) -> str:
+        """Returns the path of the processed game ID index kept next to an output PGN."""
+        return output_pgn_path + settings.PROCESSED_IDS_INDEX_SUFFIX
+
+    @classmethod
+    def _output_stamp(cls, output_stat: os.stat_result) -> str:
+        """Returns the index line recording the output PGN's size and modification time."""
+        return f"{cls._IDS_INDEX_STAMP_PREFIX}{output_stat.st_size} {output_stat.st_mtime_ns}"
+
     def get_processed_game_ids(self, output_pgn_path: str) -> Set[str]:
         """
-        Efficiently scans an existing output PGN to find IDs of already processed games.
+        Returns the IDs of games already present in an existing output PGN.
+
+        The IDs are read from the sidecar index written by `flush_exports`, which ends with a
+        stamp of the output's size and modification time. An index whose last stamp does not
+        match the output (missing, truncated, replaced or written by an interrupted run) is
+        not trusted: the output is scanned and the index is rewritten from the scan. If the
+        scan fails, no index is kept and the next run scans again.
         """
         processed_ids: Set[str] = set()
+        index_path = self.get_processed_ids_index_path(output_pgn_path)
+        self._complete_index_paths.discard(index_path)
         if not os.path.exists(output_pgn_path):
+            # An index without its PGN is stale and must not cause games to be skipped.
+            if os.path.exists(index_path):
+                logger.info(f"Removing stale game ID index '{index_path}'.")
+                os.remove(index_path)
+            # Every game in the new output will be indexed as it is exported.
+            self._complete_index_paths.add(index_path)
             return processed_ids
 
+        try:
+            with open(index_path, 'r', encoding='utf-8') as index_file:
+                index_lines = index_file.read().splitlines()
+            if index_lines and index_lines[-1] == self._output_stamp(os.stat(output_pgn_path)):
+                processed_ids = {
+                    line for line in index_lines if line and not line.startswith(self._IDS_INDEX_STAMP_PREFIX)
+                }
+                logger.info(f"Loaded {len(processed_ids)} processed game IDs from '{index_path}'.")
+                self._complete_index_paths.add(index_path)
+                return processed_ids
+            logger.info(f"Game ID index '{index_path}' does not match '{output_pgn_path}', rescanning output PGN.")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not read game ID index '{index_path}', rescanning output PGN: {e}")
+
         logger.info(f"Scanning '{output_pgn_path}' for existing game IDs...")
         try:
             for headers in self._stream_games_headers_only(output_pgn_path):
@@ -78,7 +198,23 @@ class PGNHandler:
                     processed_ids.add(game_id)
             logger.info(f"Found {len(processed_ids)} processed game IDs.")
         except PGNImportError as e:
+            # A partial scan must not be stamped as complete; drop the index so the next run rescans.
             logger.warning(f"Could not fully parse existing PGN for IDs due to error: {e}")
+            try:
+                os.remove(index_path)
+            except FileNotFoundError:
+                pass
+            except OSError as remove_error:
+                logger.warning(f"Could not remove game ID index '{index_path}': {remove_error}")
+            return processed_ids
+
+        try:
+            with open(index_path, 'w', encoding='utf-8') as index_file:
+                index_file.writelines(f"{game_id}\n" for game_id in processed_ids)
+                index_file.write(self._output_stamp(os.stat(output_pgn_path)) + "\n")
+            self._complete_index_paths.add(index_path)
+        except OSError as e:
+            logger.warning(f"Could not write game ID index '{index_path}': {e}")
         return processed_ids
 
     def _stream_games_headers_only(self, pgn_path: str) -> Generator[chess.pgn.Headers, None, None]:
@@ -90,19 +226,46 @@ class PGNHandler:
         except (IOError, OSError) as e:
             raise PGNImportError(f"Cannot read headers from PGN file '{pgn_path}'") from e
 
-    def stream_games(self, input_pgn_path: str, shutdown_event: Optional[threading.Event] = None) -> Generator[chess.pgn.Game, None, None]:
-        """Streams full game objects one by one from an input PGN file."""
+    def stream_games(
+        self,
+        input_pgn_path: str,
+        shutdown_event: Optional[threading.Event] = None,
+        skip_ids: Optional[Set[str]] = None,
+        skipped_callback: Optional[Callable[[], None]] = None,
+    ) -> Generator[chess.pgn.Game, None, None]:
+        """
+        Streams full game objects one by one from an input PGN file.
+
+        Games whose ID is in `skip_ids` are not yielded; only their headers are
+        parsed, and `skipped_callback` is called once for each of them.
+        """
         if not os.path.exists(input_pgn_path):
             raise PGNImportError(f"Input PGN file not found: {input_pgn_path}")
 
+        builder: Optional[_SkippingGameBuilder] = None
+
+        def make_builder() -> _SkippingGameBuilder:
+            nonlocal builder
+            builder = _SkippingGameBuilder(self.extract_game_id, skip_ids or set())
+            return builder
+
         game_count = 0
+        skipped_count = 0
         try:
             with open(input_pgn_path, 'r', encoding='utf-8', errors='replace') as pgn_file:
                 while not (shutdown_event and shutdown_event.is_set()):
                     try:
-                        game = chess.pgn.read_game(pgn_file)
+                        if skip_ids:
+                            game = chess.pgn.read_game(pgn_file, Visitor=make_builder)
+                        else:
+                            game = chess.pgn.read_game(pgn_file)
                         if game is None:
                             break 
+                        if skip_ids and builder is not None and builder.skipped:
+                            skipped_count += 1
+                            if skipped_callback:
+                                skipped_callback()
+                            continue
                         game_count += 1
                         yield game
                     except (ValueError, RuntimeError) as e:
@@ -112,61 +275,107 @@ class PGNHandler:
             raise PGNImportError(f"IOError reading PGN file '{input_pgn_path}'") from e
         
         if not (shutdown_event and shutdown_event.is_set()):
-            logger.info(f"Finished streaming {game_count} games from '{input_pgn_path}'.")
+            logger.info(
+                f"Finished streaming {game_count} games from '{input_pgn_path}' "
+                f"({skipped_count} already processed games skipped)."
+            )
 
-    def collect_move_data_and_fens(self, game: chess.pgn.Game) -> Tuple[List[MoveData], OrderedDict[str, None]]:
+    def collect_move_data_and_fens(self, game: chess.pgn.Game) -> Tuple[List[MoveData], Dict[str, None]]:
         """Iterates through a game, collecting move details and unique FENs."""
         all_move_details: List[MoveData] = []
-        game_unique_fens: OrderedDict[str, None] = OrderedDict()
         
         board = game.board()
-        game_unique_fens[board.fen()] = None
+        # Standard boards are recorded as snapshots; variant boards have extra state and are copied.
+        is_standard_board = type(board) is chess.Board
+        # Bound once; the loop below runs for every move of every game.
+        push = board.push
+        snapshot = BoardSnapshot.from_board
+        position_fen = _position_fen
+        intern = sys.intern
+        append_move = all_move_details.append
+        move_data_cls = MoveData
+
+        # FENs are interned so positions repeated across games share one string object.
+        start_fen = fen_after = intern(position_fen(board))
 
         for node in game.mainline():
             move = node.move
             if move is None:
                 continue
 
-            fen_before = board.fen()
-            board_before_copy = board.copy(stack=False)
+            # The position before this move is the one after the previous move.
+            fen_before = fen_after
+            board_before = snapshot(board) if is_standard_board else board.copy(stack=False)
             
-            board.push(move)
-            fen_after = board.fen()
+            push(move)
+            fen_after = intern(position_fen(board))
 
-            all_move_details.append(MoveData(
+            append_move(move_data_cls(
                 pgn_node=node,
                 actual_move_obj=move,
-                board_before_move=board_before_copy,
+                board_before_move=board_before,
                 fen_before_move=fen_before,
                 fen_after_move=fen_after,
             ))
-            game_unique_fens[fen_before] = None
-            game_unique_fens[fen_after] = None
             
+        # Every position is the start position or the position after some move. They are
+        # deduplicated in one pass at the end; a plain dict keeps first-seen order, so the
+        # engine sees positions in game order.
+        game_unique_fens: Dict[str, None] = dict.fromkeys(
+            chain((start_fen,), map(attrgetter("fen_after_move"), all_move_details))
+        )
         return all_move_details, game_unique_fens
 
-    def export_annotated_game(self, game: chess.pgn.Game, outfile_handle: IO[str]) -> None:
-        """Exports a game to the provided file stream with simple, robust newline handling."""
-        handle_id = id(outfile_handle)
-        if handle_id not in self._is_first_export_to_handle:
-            self._is_first_export_to_handle[handle_id] = outfile_handle.tell() == 0
+    @staticmethod
+    def needs_game_separator(output_pgn_path: str) -> bool:
+        """
+        Tells whether a game appended to an existing output PGN must be preceded by a
+        blank line, i.e. the file is non-empty and does not already end with one.
+        """
+        try:
+            with open(output_pgn_path, 'rb') as pgn_file:
+                size = pgn_file.seek(0, os.SEEK_END)
+                pgn_file.seek(max(0, size - 4))
+                tail = pgn_file.read()
+        except FileNotFoundError:
+            return False
+        return bool(tail) and not tail.endswith((b"\n\n", b"\n\r\n"))
 
+    def export_annotated_game(self, game: chess.pgn.Game, outfile_handle: IO[str], needs_separator: bool) -> bool:
+        """
+        Exports a game directly to the provided file stream. Every game is followed by a
+        blank line; `needs_separator` adds one before the game for files that lack it
+        (see `needs_game_separator`). Returns the value to pass for the next export.
+        The stream is not flushed; see `flush_exports`.
+        """
         try:
-            exporter = chess.pgn.StringExporter(
-                headers=True, variations=True, comments=True,
-                columns=self.pgn_output_columns if self.pgn_output_columns > 0 else None
-            )
-            pgn_string = game.accept(exporter)
+            if self._exporter is None or self._exporter.handle is not outfile_handle:
+                self._exporter = chess.pgn.FileExporter(outfile_handle, **self._exporter_options)
 
-            if not self._is_first_export_to_handle[handle_id]:
+            if needs_separator:
                 outfile_handle.write("\n\n")
 
-            outfile_handle.write(pgn_string)
-            outfile_handle.flush()
-            
-            self._is_first_export_to_handle[handle_id] = False
+            game.accept(self._exporter)
+            return False
 
         except (IOError, OSError) as e:
             raise PGNExportError(f"IOError exporting game: {e}") from e
         except Exception as e:
-            raise PGNExportError(f"Unexpected error exporting game: {e}") from e
\ No newline at end of file
+            raise PGNExportError(f"Unexpected error exporting game: {e}") from e
+
+    def flush_exports(self, outfile_handle: IO[str], ids_index_handle: IO[str], game_ids: List[str]) -> None:
+        """
+        Flushes exported games, then records their IDs in the processed game ID index.
+        The output is flushed first, so the index never lists a game missing from it.
+
+        The IDs are followed by a stamp of the flushed output only if `get_processed_game_ids`
+        found the index to be complete; an incomplete index stays unstamped and is rescanned.
+        """
+        try:
+            outfile_handle.flush()
+            ids_index_handle.writelines(f"{game_id}\n" for game_id in game_ids)
+            if getattr(ids_index_handle, "name", None) in self._complete_index_paths:
+                ids_index_handle.write(self._output_stamp(os.fstat(outfile_handle.fileno())) + "\n")
+            ids_index_handle.flush()
+        except (IOError, OSError) as e:
+            raise PGNExportError(f"IOError flushing exported games: {e}") from e
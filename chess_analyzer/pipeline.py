@@ -7,11 +7,12 @@ import logging
 import os
 import time
 import threading
-from typing import Optional, List
+from typing import Optional, List, Union
 from tqdm import tqdm
 
 # Import services and data contracts
 from chess_analyzer.engine.stockfish_controller import StockfishController, StockfishError
+from chess_analyzer.engine.stockfish_pool import StockfishPool
 from chess_analyzer.cache.db_manager import DBManager, CacheError
 from chess_analyzer.pgn.pgn_handler import PGNHandler, PGNError
 from chess_analyzer.analysis.move_classifier import MoveClassifier
@@ -21,6 +22,7 @@ from chess_analyzer.statistics import StatisticsTracker
 from chess_analyzer.game_processor import GameProcessor
 from chess_analyzer.analysis.analysis_provider import AnalysisProvider # New Import
 from chess_analyzer.utils.signal_manager import SignalManager
+from chess_analyzer.utils.background_iterator import BackgroundIterator
 from chess_analyzer.config import settings
 from chess_analyzer.types import GameSummary, ProgressReporter # New Import
 
@@ -28,20 +30,35 @@ logger = logging.getLogger(settings.APP_NAME + ".Pipeline")
 
 # --- TQDM Adapter for our ProgressReporter Protocol ---
 class TqdmProgressReporter:
-    """An adapter that makes a tqdm progress bar conform to our ProgressReporter protocol."""
-    def __init__(self, pbar: tqdm):
+    """
+    An adapter that makes a tqdm progress bar conform to our ProgressReporter protocol.
+    Updates are accumulated and passed to tqdm in batches, keeping per-FEN calls cheap.
+    """
+    def __init__(self, pbar: tqdm, batch_size: int = settings.PROGRESS_UPDATE_BATCH):
         self._pbar = pbar
+        self._batch_size = batch_size
+        self._pending = 0
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._pbar.update(self._pending)
+            self._pending = 0
 
     def reset(self, total: int = 0) -> None:
+        self._flush()
         self._pbar.reset(total=total)
 
     def update(self, n: int = 1) -> None:
-        self._pbar.update(n)
+        self._pending += n
+        if self._pending >= self._batch_size:
+            self._flush()
 
     def set_description(self, desc: str) -> None:
+        self._flush()
         self._pbar.set_description_str(desc)
     
     def close(self) -> None:
+        self._flush()
         self._pbar.close()
 
 class AnalysisPipeline:
@@ -59,7 +76,14 @@ class AnalysisPipeline:
         # --- Component Initialization ---
         self.pgn_handler = PGNHandler(pgn_output_columns=kwargs.get('pgn_write_columns', settings.PGN_DEFAULT_COLUMNS))
         self.db_manager = DBManager()
-        self.stockfish_controller = StockfishController(path=self.stockfish_path, depth=self.analysis_depth, **kwargs)
+        engine_workers = kwargs.get('engine_workers', settings.DEFAULT_ENGINE_WORKERS)
+        self.stockfish_controller: Union[StockfishController, StockfishPool]
+        if engine_workers == 1:
+            self.stockfish_controller = StockfishController(path=self.stockfish_path, depth=self.analysis_depth, **kwargs)
+        else:
+            self.stockfish_controller = StockfishPool(
+                path=self.stockfish_path, depth=self.analysis_depth, num_workers=engine_workers or None, **kwargs
+            )
         self.move_classifier = MoveClassifier()
         
         sf_version = self.stockfish_controller.get_stockfish_version()
@@ -106,36 +130,70 @@ class AnalysisPipeline:
         with SignalManager(self.shutdown_event), self.db_manager, self.stockfish_controller:
             try:
                 processed_ids = self.pgn_handler.get_processed_game_ids(output_pgn_path)
-                self.stats_tracker.add_game_skipped(f"already_processed', {len(processed_ids)}")
                 game_summaries: List[GameSummary] = []
                 
+                ids_index_path = self.pgn_handler.get_processed_ids_index_path(output_pgn_path)
+                needs_separator = self.pgn_handler.needs_game_separator(output_pgn_path)
                 with open(output_pgn_path, 'a+', encoding='utf-8') as outfile, \
-                     tqdm(total=0, unit="FENs", bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt}") as fen_pbar:
+                     open(ids_index_path, 'a', encoding='utf-8') as ids_index_file, \
+                     tqdm(
+                         total=0, unit="FENs", bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt}",
+                         mininterval=settings.PROGRESS_MIN_INTERVAL_S, miniters=settings.PROGRESS_MIN_ITERS, smoothing=0,
+                     ) as fen_pbar:
                     
                     fen_progress_reporter = TqdmProgressReporter(fen_pbar)
 
-                    for game in self.pgn_handler.stream_games(input_pgn_path, self.shutdown_event):
-                        if self.shutdown_event.is_set(): break
-                        self.stats_tracker.add_game_read()
-                        
-                        try:
-                            result, cache_hits, engine_runs = self.game_processor.process_game(
-                                game, target_player, fen_progress_reporter
-                            )
+                    # Upcoming games are parsed on a reader thread while the engine works on the current one.
+                    games = BackgroundIterator(
+                        self.pgn_handler.stream_games(
+                            input_pgn_path, self.shutdown_event,
+                            skip_ids=processed_ids,
+                            skipped_callback=lambda: self.stats_tracker.add_game_skipped("already_processed"),
+                        ),
+                        max_buffered=settings.PGN_PREFETCH_GAMES,
+                        name="PGNReader",
+                    )
+                    # Exported since the last flush; recorded in the index once the output is flushed.
+                    unflushed_game_ids: List[str] = []
+                    games_since_flush = 0
+                    try:
+                        for game in games:
+                            if self.shutdown_event.is_set(): break
+                            self.stats_tracker.add_game_read()
                             
-                            self.stats_tracker.add_fen_cache_hits(cache_hits)
-                            self.stats_tracker.add_fens_analyzed_by_engine(engine_runs)
-
-                            self.pgn_handler.export_annotated_game(result.annotated_game, outfile)
-                            self.stats_tracker.add_game_analyzed()
-                            
-                            if result.summary:
-                                game_summaries.append(result.summary)
+                            try:
+                                result, cache_hits, engine_runs = self.game_processor.process_game(
+                                    game, target_player, fen_progress_reporter
+                                )
+                                
+                                self.stats_tracker.add_fen_cache_hits(cache_hits)
+                                self.stats_tracker.add_fens_analyzed_by_engine(engine_runs)
+
+                                needs_separator = self.pgn_handler.export_annotated_game(
+                                    result.annotated_game, outfile, needs_separator
+                                )
+                                self.stats_tracker.add_game_analyzed()
+
+                                game_id = self.pgn_handler.extract_game_id(result.annotated_game.headers)
+                                if game_id:
+                                    unflushed_game_ids.append(game_id)
+                                games_since_flush += 1
+                                if games_since_flush >= settings.PGN_EXPORT_FLUSH_INTERVAL:
+                                    self.pgn_handler.flush_exports(outfile, ids_index_file, unflushed_game_ids)
+                                    unflushed_game_ids.clear()
+                                    games_since_flush = 0
                                 
-                        except (StockfishError, CacheError, PGNError) as e:
-                            logger.error(f"Critical error processing game: {e}. Skipping.", exc_info=False)
-                            self.stats_tracker.add_game_with_error()
-                            continue
+                                if result.summary:
+                                    game_summaries.append(result.summary)
+                                    
+                            except (StockfishError, CacheError, PGNError) as e:
+                                logger.error(f"Critical error processing game: {e}. Skipping.", exc_info=False)
+                                self.stats_tracker.add_game_with_error()
+                                continue
+                    finally:
+                        games.close()
+                        fen_progress_reporter.close()
+                        self.pgn_handler.flush_exports(outfile, ids_index_file, unflushed_game_ids)
 
                 if game_summaries:
                     self.stats_tracker.set_games_summarized_for_report(len(game_summaries))
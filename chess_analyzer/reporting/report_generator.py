@@ -10,7 +10,7 @@ import csv
 import logging
 import math
 import os
-from typing import List, Dict, Any
+from typing import Any, Iterator, List, Tuple
 
 from chess_analyzer.config import settings
 from chess_analyzer.types import GameSummary
@@ -23,14 +23,18 @@ logger = logging.getLogger(settings.APP_NAME + ".ReportGenerator")
 class ReportGenerator:
     """Generates reports from chess analysis data."""
     
+    # PGN header tags copied into the report, in column order.
+    _PGN_HEADER_COLUMNS: Tuple[str, ...] = (
+        "Event", "Site", "Date", "Round", "White", "Black", "Result",
+        "WhiteACPL", "BlackACPL"
+    )
     _CSV_HEADERS: List[str] = [
         "GameID", "AnalyzedPlayer", "PlayerColor", "AccuracyPercent",
         "AverageCPL", "TotalMoves",
         "Brilliant", "Great", "Best", "Good", "OK", "Dubious",
         "Inaccuracy", "Mistake", "Blunder",
         "EngineTop1MatchPercent", "EngineTopNMatchPercent",
-        "Event", "Site", "Date", "Round", "White", "Black", "Result",
-        "WhiteACPL", "BlackACPL"
+        *_PGN_HEADER_COLUMNS,
     ]
 
     def __init__(self):
@@ -56,62 +60,87 @@ class ReportGenerator:
         
         return max(0.0, min(100.0, accuracy))
 
-    def generate_csv_report(self, game_summaries: List[GameSummary], output_report_path: str) -> None:
-        """Generates a CSV summary report from a list of structured GameSummary objects."""
-        if not game_summaries:
-            logger.info("No game summary data provided; CSV report will not be generated.")
-            return
+    def _calculate_accuracies(self, average_cpls: List[float]) -> List[float]:
+        """
+        Calculates the accuracy for many ACPL values in a single pass.
+        Equivalent to calling `_calculate_accuracy` on each value.
+        """
+        a = settings.ACCURACY_CONSTANT_A
+        b = settings.ACCURACY_CONSTANT_B
+        c = settings.ACCURACY_CONSTANT_C
+        if b > 0:
+            # exp() can overflow for a growing curve; take the guarded path.
+            return [self._calculate_accuracy(average_cpl) for average_cpl in average_cpls]
 
-        logger.info(f"Generating CSV summary report for {len(game_summaries)} games at: '{output_report_path}'")
+        exp = math.exp
+        # With b <= 0 and the ACPL clamped to >= 0, exp() stays within [0, 1].
+        return [
+            max(0.0, min(100.0, a * exp(b * (average_cpl if average_cpl > 0.0 else 0.0)) + c))
+            for average_cpl in average_cpls
+        ]
 
-        rows_to_write: List[Dict[str, Any]] = []
-        for summary in game_summaries:
+    def _iter_rows(
+        self, scored_summaries: List[Tuple[GameSummary, float]], accuracies: List[float]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Yields one CSV row per scored game summary, with values in the order of `_CSV_HEADERS`."""
+        pgn_header_columns = self._PGN_HEADER_COLUMNS
+        for (summary, average_cpl), accuracy_percent in zip(scored_summaries, accuracies):
             total_moves = len(summary.player_cpls)
-            if total_moves == 0:
-                continue
-
-            average_cpl = sum(summary.player_cpls) / total_moves
-            accuracy_percent = self._calculate_accuracy(average_cpl)
 
             top1_match_percent = (summary.engine_top1_match_count / total_moves) * 100.0
             topN_match_percent = (summary.engine_topN_match_count / total_moves) * 100.0
             
             counts = summary.move_classification_counts
-            
-            row_data = {
-                "GameID": summary.game_id,
-                "AnalyzedPlayer": summary.analyzed_player_name,
-                "PlayerColor": summary.player_color_str,
-                "AccuracyPercent": f"{accuracy_percent:.1f}",
-                "AverageCPL": f"{average_cpl:.1f}",
-                "TotalMoves": total_moves,
-                "Brilliant": counts.get("Brilliant ✨", 0),
-                "Great": counts.get("Great Move !", 0),
-                "Best": counts.get("Best", 0),
-                "Good": counts.get("Good", 0),
-                "OK": counts.get("OK", 0),
-                "Dubious": counts.get("Dubious", 0),
-                "Inaccuracy": counts.get("Inaccuracy", 0),
-                "Mistake": counts.get("Mistake", 0),
-                "Blunder": counts.get("Blunder", 0),
-                "EngineTop1MatchPercent": f"{top1_match_percent:.1f}",
-                "EngineTopNMatchPercent": f"{topN_match_percent:.1f}",
-                **summary.pgn_headers,
-            }
-            rows_to_write.append(row_data)
-
-        if not rows_to_write:
+            pgn_headers = summary.pgn_headers
+
+            yield (
+                summary.game_id,
+                summary.analyzed_player_name,
+                summary.player_color_str,
+                f"{accuracy_percent:.1f}",
+                f"{average_cpl:.1f}",
+                total_moves,
+                counts.get("Brilliant ✨", 0),
+                counts.get("Great Move !", 0),
+                counts.get("Best", 0),
+                counts.get("Good", 0),
+                counts.get("OK", 0),
+                counts.get("Dubious", 0),
+                counts.get("Inaccuracy", 0),
+                counts.get("Mistake", 0),
+                counts.get("Blunder", 0),
+                f"{top1_match_percent:.1f}",
+                f"{topN_match_percent:.1f}",
+                *[pgn_headers.get(tag, "") for tag in pgn_header_columns],
+            )
+
+    def generate_csv_report(self, game_summaries: List[GameSummary], output_report_path: str) -> None:
+        """Generates a CSV summary report from a list of structured GameSummary objects."""
+        if not game_summaries:
+            logger.info("No game summary data provided; CSV report will not be generated.")
+            return
+
+        logger.info(f"Generating CSV summary report for {len(game_summaries)} games at: '{output_report_path}'")
+
+        # Average CPLs for every game with moves, then all accuracies in one pass.
+        scored_summaries = [
+            (summary, sum(summary.player_cpls) / len(summary.player_cpls))
+            for summary in game_summaries if summary.player_cpls
+        ]
+        if not scored_summaries:
             logger.info("No valid game summaries to include in the CSV report.")
             return
+        accuracies = self._calculate_accuracies([average_cpl for _, average_cpl in scored_summaries])
 
         try:
             if (output_dir := os.path.dirname(output_report_path)):
                 os.makedirs(output_dir, exist_ok=True)
 
             with open(output_report_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=self._CSV_HEADERS, extrasaction='ignore')
-                writer.writeheader()
-                writer.writerows(rows_to_write)
+                writer = csv.writer(csvfile)
+                writer.writerow(self._CSV_HEADERS)
+                # Rows are built as they are written, so no row outlives its write.
+                writer.writerows(self._iter_rows(scored_summaries, accuracies))
             logger.info(f"CSV summary report generated successfully: '{output_report_path}'")
         except IOError as e:
-            raise CSVReportError(f"Failed to write CSV report to '{output_report_path}'") from e
\ No newline at end of file
+            raise CSVReportError(f"Failed to write CSV report to '{output_report_path}'") from e
@@ -7,8 +7,7 @@ for aggregating and reporting metrics from an analysis run.
 """
 import logging
 import os
-from collections import Counter
-from typing import Optional
+from typing import Dict, Optional
 
 from chess_analyzer.config import settings
 
@@ -22,44 +21,60 @@ class StatisticsTracker:
 
     def __init__(self):
         """Initializes the StatisticsTracker with all counters set to zero."""
-        self.stats: Counter[str] = Counter()
+        # Per-game counters are plain attributes; only skip reasons need a keyed map.
+        self.games_read: int = 0
+        self.games_analyzed: int = 0
+        self.games_skipped_total: int = 0
+        self.games_with_errors: int = 0
+        self.fen_cache_hits: int = 0
+        self.fens_analyzed_by_engine: int = 0
+        self._skip_reasons: Dict[str, int] = {}
         self.games_summarized_for_report: int = 0
-        self.db_path: Optional[str] = None
-        self.report_path: Optional[str] = None
+        # Paths are stored as given and made absolute only when first read.
+        self._db_path_raw: Optional[str] = None
+        self._db_path: Optional[str] = None
+        self._report_path_raw: Optional[str] = None
+        self._report_path: Optional[str] = None
         logger.debug("StatisticsTracker initialized.")
 
     def reset(self) -> None:
         """Resets all statistics to their initial state for a new run."""
-        self.stats.clear()
+        self.games_read = 0
+        self.games_analyzed = 0
+        self.games_skipped_total = 0
+        self.games_with_errors = 0
+        self.fen_cache_hits = 0
+        self.fens_analyzed_by_engine = 0
+        self._skip_reasons.clear()
         self.games_summarized_for_report = 0
-        self.db_path = None
-        self.report_path = None
+        self._db_path_raw = self._db_path = None
+        self._report_path_raw = self._report_path = None
         logger.info("StatisticsTracker has been reset.")
 
     def add_game_read(self) -> None:
         """Increments the counter for total games read from the PGN."""
-        self.stats["games_read"] += 1
+        self.games_read += 1
 
     def add_game_skipped(self, reason: str) -> None:
         """Increments the counter for skipped games, categorized by reason."""
-        self.stats["games_skipped_total"] += 1
-        self.stats[f"skipped_{reason}"] += 1
+        self.games_skipped_total += 1
+        self._skip_reasons[reason] = self._skip_reasons.get(reason, 0) + 1
 
     def add_game_analyzed(self) -> None:
         """Increments the counter for successfully analyzed and annotated games."""
-        self.stats["games_analyzed"] += 1
+        self.games_analyzed += 1
 
     def add_game_with_error(self) -> None:
         """Increments the counter for games that failed due to a critical error."""
-        self.stats["games_with_errors"] += 1
+        self.games_with_errors += 1
 
     def add_fen_cache_hits(self, count: int) -> None:
         """Adds to the total count of FENs found in the cache."""
-        self.stats["fen_cache_hits"] += count
+        self.fen_cache_hits += count
 
     def add_fens_analyzed_by_engine(self, count: int) -> None:
         """Adds to the total count of FENs sent to the engine for analysis."""
-        self.stats["fens_analyzed_by_engine"] += count
+        self.fens_analyzed_by_engine += count
 
     def set_games_summarized_for_report(self, count: int) -> None:
         """Sets the final number of games included in the CSV report."""
@@ -67,11 +82,25 @@ class StatisticsTracker:
 
     def set_db_path(self, path: str) -> None:
         """Stores the path to the database file for final reporting."""
-        self.db_path = os.path.abspath(path)
+        self._db_path_raw, self._db_path = path, None
 
     def set_report_path(self, path: str) -> None:
         """Stores the path to the CSV report file for final reporting."""
-        self.report_path = os.path.abspath(path)
+        self._report_path_raw, self._report_path = path, None
+
+    @property
+    def db_path(self) -> Optional[str]:
+        """The absolute path to the database file, resolved once."""
+        if self._db_path is None and self._db_path_raw is not None:
+            self._db_path = os.path.abspath(self._db_path_raw)
+        return self._db_path
+
+    @property
+    def report_path(self) -> Optional[str]:
+        """The absolute path to the CSV report file, resolved once."""
+        if self._report_path is None and self._report_path_raw is not None:
+            self._report_path = os.path.abspath(self._report_path_raw)
+        return self._report_path
 
     def log_summary(self) -> None:
         """
@@ -81,28 +110,30 @@ class StatisticsTracker:
 
         # Define display order and formatting for clarity in the final log output.
         display_order = [
-            ("games_read", "Total Games Read from PGN"),
-            ("games_analyzed", "Games Fully Analyzed"),
-            ("games_skipped_total", "Total Games Skipped"),
-            ("skipped_already_processed", "  - Skipped (Already Processed)"),
-            ("skipped_no_moves", "  - Skipped (No Moves Found)"),
-            ("games_with_errors", "Games with Critical Errors"),
-            ("fen_cache_hits", "FENs Found in Cache"),
-            ("fens_analyzed_by_engine", "FENs Analyzed by Engine"),
+            (self.games_read, "Total Games Read from PGN"),
+            (self.games_analyzed, "Games Fully Analyzed"),
+            (self.games_skipped_total, "Total Games Skipped"),
+            (self._skip_reasons.get("already_processed", 0), "  - Skipped (Already Processed)"),
+            (self._skip_reasons.get("no_moves", 0), "  - Skipped (No Moves Found)"),
+            (self.games_with_errors, "Games with Critical Errors"),
+            (self.fen_cache_hits, "FENs Found in Cache"),
+            (self.fens_analyzed_by_engine, "FENs Analyzed by Engine"),
         ]
 
-        for key, display_text in display_order:
-            if key in self.stats:  # Only display if the key has been populated
-                logger.info(f"{display_text}: {self.stats[key]}")
+        for value, display_text in display_order:
+            if value:  # Only display counters that were incremented
+                logger.info(f"{display_text}: {value}")
 
         logger.info(f"Games Included in Report: {self.games_summarized_for_report}")
         logger.info("---")
         
-        if self.db_path:
-            logger.info(f"FEN Cache Database: '{self.db_path}'")
-        if self.report_path:
+        db_path = self.db_path
+        if db_path:
+            logger.info(f"FEN Cache Database: '{db_path}'")
+        report_path = self.report_path
+        if report_path:
             # Check if the report was actually created before logging success
-            if self.games_summarized_for_report > 0 and os.path.exists(self.report_path):
-                logger.info(f"CSV Report Generated: '{self.report_path}'")
+            if self.games_summarized_for_report > 0 and os.path.exists(report_path):
+                logger.info(f"CSV Report Generated: '{report_path}'")
             else:
-                logger.info(f"CSV Report Target (not generated as no summaries): '{self.report_path}'")
\ No newline at end of file
+                logger.info(f"CSV Report Target (not generated as no summaries): '{report_path}'")
\ No newline at end of file
@@ -3,8 +3,10 @@
 A central module for shared data structures and type definitions.
 ...
 """
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any, Protocol # <-- Add Protocol
+from functools import cached_property
+from typing import Optional, List, Dict, Any, Callable, NamedTuple, Protocol, Union
 
 import chess
 import chess.pgn
@@ -24,15 +26,86 @@ class GreatMoveCriteria:
     """Encapsulates all criteria for detecting a 'Great Move !'."""
     min_uniqueness_gain_cp: float
 
+class BoardSnapshot(NamedTuple):
+    """
+    An immutable record of a standard (or Chess960) board's state, without its move stack.
+
+    Taking a snapshot only reads attributes; a `chess.Board` is rebuilt from it on demand.
+    """
+    pawns: chess.Bitboard
+    knights: chess.Bitboard
+    bishops: chess.Bitboard
+    rooks: chess.Bitboard
+    queens: chess.Bitboard
+    kings: chess.Bitboard
+    occupied_white: chess.Bitboard
+    occupied_black: chess.Bitboard
+    turn: chess.Color
+    castling_rights: chess.Bitboard
+    ep_square: Optional[chess.Square]
+    halfmove_clock: int
+    fullmove_number: int
+    chess960: bool
+
+    @classmethod
+    def from_board(cls, board: chess.Board) -> "BoardSnapshot":
+        occupied_co = board.occupied_co
+        return cls(
+            board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+            occupied_co[chess.WHITE], occupied_co[chess.BLACK], board.turn,
+            board.castling_rights, board.ep_square, board.halfmove_clock, board.fullmove_number,
+            board.chess960,
+        )
+
+    def to_board(self) -> chess.Board:
+        """Returns a new stackless board, set up without running the `Board` constructor."""
+        board = chess.Board.__new__(chess.Board)
+        board.pawns = self.pawns
+        board.knights = self.knights
+        board.bishops = self.bishops
+        board.rooks = self.rooks
+        board.queens = self.queens
+        board.kings = self.kings
+        board.occupied_co = [self.occupied_black, self.occupied_white]
+        board.occupied = self.occupied_white | self.occupied_black
+        board.promoted = chess.BB_EMPTY
+        board.chess960 = self.chess960
+        board.ep_square = self.ep_square
+        board.castling_rights = self.castling_rights
+        board.turn = self.turn
+        board.fullmove_number = self.fullmove_number
+        board.halfmove_clock = self.halfmove_clock
+        board.move_stack = []
+        board._stack = []
+        return board
+
+@dataclass(frozen=True)
+class BoardFeatures:
+    """The per-position quantities the classifier reads, computed without a `chess.Board`."""
+    material_white: float
+    material_black: float
+
+    def material_diff(self, perspective_color: chess.Color) -> float:
+        """Material difference in pawn units from one side's perspective, rounded like `get_material_diff`."""
+        diff = self.material_white - self.material_black
+        return round(diff if perspective_color == chess.WHITE else -diff, 2)
+
 @dataclass(frozen=True)
 class MoveData:
     """A structured container for data related to a single move in a game."""
     pgn_node: chess.pgn.GameNode
     actual_move_obj: chess.Move
-    board_before_move: chess.Board
+    # A snapshot for standard chess; variant boards carry extra state and are kept as boards.
+    board_before_move: Union[BoardSnapshot, chess.Board]
     fen_before_move: str
     fen_after_move: str
 
+    def materialize_board(self) -> chess.Board:
+        """Returns a new stackless board for the position before the move, free to mutate."""
+        if isinstance(self.board_before_move, BoardSnapshot):
+            return self.board_before_move.to_board()
+        return self.board_before_move.copy(stack=False)
+
 @dataclass(frozen=True)
 class CacheKey:
     """A type-safe structure for the composite cache key."""
@@ -58,6 +131,8 @@ class ClassificationResult:
     is_great: bool = False
     is_engine_top_choice: bool = False
     is_engine_top_n_choice: bool = False
+    # Text without the CPL suffix (e.g. "Good" for "Good (CPL: 30)"), used for counting.
+    classification_name: Optional[str] = None
 
 @dataclass(frozen=True)
 class MoveAnalysisContext:
@@ -81,13 +156,40 @@ class MoveAnalysisContext:
     brilliant_criteria: BrilliantMoveCriteria
     great_criteria: GreatMoveCriteria
 
+@dataclass(frozen=True)
+class MoveAnalysisColumns:
+    """
+    Column-oriented MoveClassifier input for every move of a game.
+    Index i of each list refers to the i-th ply; evals are from the moving player's perspective.
+    """
+    eval_best_move: List[Optional[float]]
+    is_mate_best_move: List[bool]
+    eval_second_best_move: List[Optional[float]]
+    is_mate_second_best_move: List[bool]
+    eval_player_move: List[Optional[float]]
+    is_mate_player_move: List[bool]
+    engine_top_lines: List[List[Dict[str, Any]]]
+    player_move_ucis: List[str]
+    player_colors: List[chess.Color]
+    engine_multipv: int
+    brilliant_criteria: BrilliantMoveCriteria
+    great_criteria: GreatMoveCriteria
+
 @dataclass(frozen=True)
 class EngineLineInfo:
-    """Holds pre-formatted data for a single engine analysis line for annotation."""
+    """
+    Holds pre-formatted data for a single engine analysis line for annotation.
+    The PV is converted to SAN lazily, only if a consumer reads `pv_san_list`.
+    """
     move_san: str
     eval_str: str  # e.g., "+1.23" or "#-3"
     is_best_line: bool = False
-    pv_san_list: List[str] = field(default_factory=list)
+    pv_san_loader: Optional[Callable[[], List[str]]] = field(default=None, repr=False, compare=False)
+
+    @cached_property
+    def pv_san_list(self) -> List[str]:
+        """The line's principal variation in SAN, computed on first access."""
+        return self.pv_san_loader() if self.pv_san_loader else []
 
 @dataclass(frozen=True)
 class AnnotationContext:
@@ -112,6 +214,28 @@ class GameSummary:
     engine_topN_match_count: int
     pgn_headers: Dict[str, str]
 
+@dataclass
+class PlayerMoveTally:
+    """Running totals of one player's classification results, accumulated move by move."""
+    cpls: List[float] = field(default_factory=list)
+    cpl_sum: float = 0.0
+    classification_counts: Counter = field(default_factory=Counter)
+    engine_top1_match_count: int = 0
+    engine_topN_match_count: int = 0
+
+    def add(self, result: ClassificationResult) -> None:
+        """Adds a single move's classification result to the totals."""
+        self.cpls.append(result.cpl)
+        self.cpl_sum += result.cpl
+        name = result.classification_name or result.classification_text.partition("(")[0].rstrip()
+        self.classification_counts[name] += 1
+        self.engine_top1_match_count += result.is_engine_top_choice
+        self.engine_topN_match_count += result.is_engine_top_n_choice
+
+    @property
+    def acpl(self) -> float:
+        return self.cpl_sum / len(self.cpls) if self.cpls else 0.0
+
 @dataclass(frozen=True)
 class ProcessedGameResult:
     """The final output from processing a single game."""
@@ -0,0 +1,108 @@
+# chess_analyzer_project/chess_analyzer/utils/background_iterator.py
+"""
+Runs an iterator ahead of its consumer on a background thread.
+
+This module provides the `BackgroundIterator` class, which lets a producer
+such as the PGN game stream parse upcoming items while the consumer is busy
+(e.g. waiting on the engine). Items are delivered in order through a bounded
+queue, and exceptions raised by the producer are re-raised in the consumer.
+"""
+import logging
+import queue
+import threading
+from typing import Any, Generic, Iterable, Iterator, Tuple, TypeVar
+
+from chess_analyzer.config import settings
+
+logger = logging.getLogger(settings.APP_NAME + ".BackgroundIterator")
+
+T = TypeVar("T")
+
+# Message kinds posted by the producer thread.
+_ITEM = "item"
+_DONE = "done"
+_ERROR = "error"
+
+# How often a producer blocked on a full queue checks whether it was closed.
+_PUT_POLL_INTERVAL_S = 0.1
+
+
+class BackgroundIterator(Generic[T]):
+    """
+    Iterates over `iterable` on a daemon thread, keeping up to `max_buffered` items ready.
+
+    Usage:
+        with BackgroundIterator(pgn_handler.stream_games(path), max_buffered=4) as games:
+            for game in games:
+                ...
+
+    Closing the iterator (or leaving the `with` block) stops the producer and, if the
+    source is a generator, closes it on the producer thread.
+    """
+
+    def __init__(self, iterable: Iterable[T], max_buffered: int, name: str = "BackgroundIterator"):
+        self._iterable = iterable
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=max(1, max_buffered))
+        self._closed = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._produce, name=name, daemon=True)
+        self._thread.start()
+
+    def _put(self, message: Tuple[str, Any]) -> bool:
+        """Posts a message, giving up if the consumer closed the iterator. Returns False in that case."""
+        while not self._closed.is_set():
+            try:
+                self._queue.put(message, timeout=_PUT_POLL_INTERVAL_S)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        iterator = iter(self._iterable)
+        try:
+            for item in iterator:
+                if not self._put((_ITEM, item)):
+                    return
+            self._put((_DONE, None))
+        except BaseException as e:
+            self._put((_ERROR, e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    def __iter__(self) -> Iterator[T]:
+        return self
+
+    def __next__(self) -> T:
+        if self._finished:
+            raise StopIteration
+        kind, payload = self._queue.get()
+        if kind == _ITEM:
+            return payload
+        self._finished = True
+        if kind == _ERROR:
+            raise payload
+        raise StopIteration
+
+    def close(self) -> None:
+        """Stops the producer thread and waits for it to release the source iterator."""
+        if self._closed.is_set():
+            return
+        self._finished = True
+        self._closed.set()
+        # Unblock a producer waiting on a full queue.
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join()
+        logger.debug(f"{self._thread.name} closed.")
+
+    def __enter__(self) -> "BackgroundIterator[T]":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -7,10 +7,12 @@ boards, or pieces, and are not tied to a specific component like
 PGN handling or engine interaction. These are pure functions, making
 them easy to test and reason about.
 """
-from typing import Final, Dict
+from typing import Final, Dict, Tuple
 
 import chess
 
+from chess_analyzer.types import BoardFeatures, BoardSnapshot
+
 # --- Piece Material Values ---
 # Centralized for maintainability and clarity. Using floats for precision, which
 # is critical for accurately calculating sacrifices for "Brilliant" move detection.
@@ -72,4 +74,82 @@ def get_material_diff(board: chess.Board, perspective_color: chess.Color) -> flo
         else:
             diff -= value
     # Round to a reasonable precision to avoid floating point artifacts
-    return round(diff, 2)
\ No newline at end of file
+    return round(diff, 2)
+
+def _material_on(snapshot: BoardSnapshot, occupied: chess.Bitboard) -> float:
+    """Material value of the pieces on the `occupied` squares, from one popcount per piece type."""
+    return (
+        chess.popcount(snapshot.pawns & occupied) * PIECE_VALUES[chess.PAWN]
+        + chess.popcount(snapshot.knights & occupied) * PIECE_VALUES[chess.KNIGHT]
+        + chess.popcount(snapshot.bishops & occupied) * PIECE_VALUES[chess.BISHOP]
+        + chess.popcount(snapshot.rooks & occupied) * PIECE_VALUES[chess.ROOK]
+        + chess.popcount(snapshot.queens & occupied) * PIECE_VALUES[chess.QUEEN]
+    )
+
+
+def get_board_features(snapshot: BoardSnapshot) -> BoardFeatures:
+    """
+    Computes the classifier's board features straight from a snapshot's bitboards.
+
+    Args:
+        snapshot: A `BoardSnapshot` of a standard chess position.
+
+    Returns:
+        The `BoardFeatures` of the position.
+    """
+    return BoardFeatures(
+        material_white=_material_on(snapshot, snapshot.occupied_white),
+        material_black=_material_on(snapshot, snapshot.occupied_black),
+    )
+
+
+def get_move_material_gain(snapshot: BoardSnapshot, move: chess.Move) -> float:
+    """
+    Calculates how much a move changes the mover's material difference.
+
+    The gain is the value of a captured piece (including en passant) plus the
+    value added by a promotion. No board is built or pushed.
+
+    Args:
+        snapshot: A `BoardSnapshot` of the position before the move.
+        move: A legal move in that position.
+
+    Returns:
+        The material gained by the side to move, in pawn units.
+    """
+    gain: float = 0.0
+    to_mask = chess.BB_SQUARES[move.to_square]
+    occupied_them = snapshot.occupied_black if snapshot.turn == chess.WHITE else snapshot.occupied_white
+    if to_mask & occupied_them:
+        for bitboard, piece_type in (
+            (snapshot.pawns, chess.PAWN), (snapshot.knights, chess.KNIGHT), (snapshot.bishops, chess.BISHOP),
+            (snapshot.rooks, chess.ROOK), (snapshot.queens, chess.QUEEN),
+        ):
+            if bitboard & to_mask:
+                gain += PIECE_VALUES[piece_type]
+                break
+    elif move.to_square == snapshot.ep_square and snapshot.pawns & chess.BB_SQUARES[move.from_square]:
+        # En passant: the captured pawn is not on the destination square.
+        gain += PIECE_VALUES[chess.PAWN]
+
+    if move.promotion:
+        gain += PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN]
+    return gain
+
+
+def get_material_diffs_for_move(snapshot: BoardSnapshot, move: chess.Move) -> Tuple[float, float]:
+    """
+    Calculates the mover's material difference before and after a move.
+
+    Equivalent to `get_material_diff` on the boards before and after the move,
+    from the perspective of the side to move.
+
+    Args:
+        snapshot: A `BoardSnapshot` of the position before the move.
+        move: A legal move in that position.
+
+    Returns:
+        A (before, after) tuple of material differences in pawn units.
+    """
+    diff_before = get_board_features(snapshot).material_diff(snapshot.turn)
+    return diff_before, round(diff_before + get_move_material_gain(snapshot, move), 2)
@@ -41,6 +41,13 @@ def find_stockfish_executable() -> Optional[str]:
     
     return None
 
+def non_negative_int(value: str) -> int:
+    """Argparse type for integer options where negative values are meaningless."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or a positive integer, got {number}")
+    return number
+
 def main():
     """Parses command-line arguments and runs the chess analysis pipeline."""
     # --- Argument Parsing ---
@@ -84,6 +91,10 @@ def main():
         "--hash", type=int, default=settings.DEFAULT_STOCKFISH_HASH_MB,
         help="Hash memory (in MB) for Stockfish."
     )
+    parser.add_argument(
+        "--engine-workers", type=non_negative_int, default=settings.DEFAULT_ENGINE_WORKERS,
+        help="Number of parallel Stockfish processes (each uses 1 thread and a share of the hash). 0 means auto: one per CPU core."
+    )
     parser.add_argument(
         "--pgn-columns", type=int, default=settings.PGN_DEFAULT_COLUMNS,
         help="Column width for wrapping move text in the output PGN. 0 for no wrapping."
@@ -123,6 +134,7 @@ def main():
             'multipv_count': args.multipv,
             'stockfish_threads': args.threads,
             'stockfish_hash_mb': args.hash,
+            'engine_workers': args.engine_workers,
             'pgn_write_columns': args.pgn_columns
         }
         
@@ -0,0 +1,75 @@
+"""
+Unit tests for the AnalysisProvider.
+"""
+from chess_analyzer.analysis.analysis_provider import AnalysisProvider
+
+
+class _FakeDBManager:
+    """Serves a fixed set of cached analyses and records what was requested and stored."""
+    def __init__(self, cached):
+        self.cached = cached
+        self.requested = []
+        self.stored = []
+
+    def get_cached_analyses_batch(self, fens, **kwargs):
+        self.requested.append(list(fens))
+        return {fen: self.cached[fen] for fen in fens if fen in self.cached}
+
+    def store_analyses_batch(self, entries):
+        self.stored.extend(entry.key.fen for entry in entries)
+
+
+class _FakeEngine:
+    """Returns a one-line analysis for every FEN and records each batch."""
+    def __init__(self):
+        self.batches = []
+
+    def analyze_fens_batch(self, fens, progress_callback=None):
+        self.batches.append(list(fens))
+        return {fen: [{"Move": "e2e4", "Centipawn": 10, "Mate": None}] for fen in fens}
+
+
+class _NullProgress:
+    def reset(self, total=0): pass
+    def update(self, n=1): pass
+    def set_description(self, desc): pass
+    def close(self): pass
+
+
+def _make_provider(db_manager, engine, run_memo_size=100):
+    return AnalysisProvider(
+        analysis_depth=10, multipv_count=1, stockfish_path="sf", stockfish_version="16",
+        db_manager=db_manager, stockfish_controller=engine, run_memo_size=run_memo_size,
+    )
+
+
+def test_positions_seen_earlier_in_the_run_skip_cache_and_engine(sample_game):
+    """
+    Tests that a position served once in a run is not requested from the cache or the engine again.
+    """
+    db_manager = _FakeDBManager(cached={"A": [{"Move": "d2d4", "Centipawn": 5, "Mate": None}]})
+    engine = _FakeEngine()
+    provider = _make_provider(db_manager, engine)
+
+    first, hits, runs = provider.get_analyses_for_game(sample_game, _NullProgress(), required_fens=["A", "B"])
+    assert (hits, runs) == (1, 1)
+
+    second, hits, runs = provider.get_analyses_for_game(sample_game, _NullProgress(), required_fens=["A", "B", "C"])
+    assert (hits, runs) == (2, 1)
+    assert second == {**first, "C": [{"Move": "e2e4", "Centipawn": 10, "Mate": None}]}
+    assert db_manager.requested == [["A", "B"], ["C"]]
+    assert engine.batches == [["B"], ["C"]]
+    assert db_manager.stored == ["B", "C"]
+
+
+def test_run_memo_can_be_disabled(sample_game):
+    """
+    Tests that with a zero-sized run memo every game goes back to the cache.
+    """
+    db_manager = _FakeDBManager(cached={"A": [{"Move": "d2d4", "Centipawn": 5, "Mate": None}]})
+    provider = _make_provider(db_manager, _FakeEngine(), run_memo_size=0)
+
+    provider.get_analyses_for_game(sample_game, _NullProgress(), required_fens=["A"])
+    provider.get_analyses_for_game(sample_game, _NullProgress(), required_fens=["A"])
+
+    assert db_manager.requested == [["A"], ["A"]]
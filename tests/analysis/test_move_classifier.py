@@ -0,0 +1,111 @@
+"""
+Unit tests for the MoveClassifier.
+"""
+import pytest
+import chess
+
+from chess_analyzer.analysis.move_classifier import MoveClassifier
+from chess_analyzer.context_builders import (
+    build_move_analysis_columns,
+    build_move_analysis_context,
+    get_lines_per_ply,
+)
+from chess_analyzer.game_processor import GameProcessor
+from chess_analyzer.pgn.pgn_handler import PGNHandler
+
+
+@pytest.fixture
+def sample_analyses(sample_game):
+    """
+    Provides two engine lines (White's POV) for every position of the sample_game,
+    where the first legal move found is always the engine's best move.
+    """
+    analyses = {}
+    board = sample_game.board()
+    positions = [board.copy()]
+    for move in sample_game.mainline_moves():
+        board.push(move)
+        positions.append(board.copy())
+
+    for i, position in enumerate(positions):
+        legal = [m.uci() for m in position.legal_moves]
+        analyses[position.fen()] = [
+            {"Move": legal[0], "Centipawn": 30 - 40 * i, "Mate": None},
+            {"Move": legal[1], "Centipawn": -200, "Mate": None},
+        ]
+    return analyses
+
+
+def test_classify_batch_matches_classify_move(sample_game, sample_analyses):
+    """
+    Tests that classifying a whole game from columns gives the same results as
+    classifying each move from its own context.
+    """
+    classifier = MoveClassifier()
+    move_data_list, _ = PGNHandler().collect_move_data_and_fens(sample_game)
+
+    lines_before, lines_after = get_lines_per_ply(move_data_list, sample_analyses)
+    columns = build_move_analysis_columns(move_data_list, lines_before, lines_after, multipv_setting=2)
+    batch_results = classifier.classify_batch(columns, lambda i: GameProcessor._material_diffs_for_move(move_data_list[i]))
+    single_results = [
+        classifier.classify_move(build_move_analysis_context(md, before, after, multipv_setting=2))
+        for md, before, after in zip(move_data_list, lines_before, lines_after)
+    ]
+
+    assert batch_results == single_results
+    assert len(batch_results) == len(move_data_list)
+
+
+def test_classify_batch_only_counts_material_for_sacrifice_candidates(sample_game, sample_analyses):
+    """
+    Tests that material is not requested for moves that fail the evaluation checks
+    for a Brilliant move.
+    """
+    classifier = MoveClassifier()
+    move_data_list, _ = PGNHandler().collect_move_data_and_fens(sample_game)
+    # Every move drops 40cp or more against the engine line, failing the eval-drop condition.
+    for lines in sample_analyses.values():
+        lines[0]["Centipawn"] -= 1000
+
+    requested = []
+
+    def get_material_diffs(i):
+        requested.append(i)
+        return GameProcessor._material_diffs_for_move(move_data_list[i])
+
+    lines_before, lines_after = get_lines_per_ply(move_data_list, sample_analyses)
+    columns = build_move_analysis_columns(move_data_list, lines_before, lines_after, multipv_setting=2)
+    results = classifier.classify_batch(columns, get_material_diffs)
+
+    assert requested == []
+    assert not any(r.is_brilliant for r in results)
+
+
+def test_classify_batch_reports_missing_evals(sample_game):
+    """
+    Tests that moves without engine data are reported as unavailable.
+    """
+    classifier = MoveClassifier()
+    move_data_list, _ = PGNHandler().collect_move_data_and_fens(sample_game)
+
+    lines_before, lines_after = get_lines_per_ply(move_data_list, {})
+    columns = build_move_analysis_columns(move_data_list, lines_before, lines_after, multipv_setting=2)
+    results = classifier.classify_batch(columns, lambda i: pytest.fail("material should not be requested"))
+
+    assert [r.classification_text for r in results] == ["Unavailable (eval error)"] * len(move_data_list)
+    assert columns.player_colors == [chess.WHITE, chess.BLACK] * 3
+
+
+def test_classification_name_matches_text_without_cpl_suffix(sample_game, sample_analyses):
+    """
+    Tests that the short classification name is the classification text stripped of its CPL suffix.
+    """
+    classifier = MoveClassifier()
+    move_data_list, _ = PGNHandler().collect_move_data_and_fens(sample_game)
+
+    lines_before, lines_after = get_lines_per_ply(move_data_list, sample_analyses)
+    columns = build_move_analysis_columns(move_data_list, lines_before, lines_after, multipv_setting=2)
+    results = classifier.classify_batch(columns, lambda i: GameProcessor._material_diffs_for_move(move_data_list[i]))
+
+    for result in results:
+        assert result.classification_name == result.classification_text.split("(")[0].strip()
@@ -35,7 +35,7 @@ def sample_move_data_e4(sample_game: chess.pgn.Game) -> "MoveData":
     Provides a MoveData object for the first move of the sample_game (1. e4).
     """
     # This requires a bit of setup to get the specific node
-    from chess_analyzer.types import MoveData
+    from chess_analyzer.types import BoardSnapshot, MoveData
     
     node = sample_game.variations[0] # This is the node for 1. e4
     board_before = sample_game.board() # The starting position
@@ -45,7 +45,7 @@ def sample_move_data_e4(sample_game: chess.pgn.Game) -> "MoveData":
     return MoveData(
         pgn_node=node,
         actual_move_obj=node.move,
-        board_before_move=board_before,
+        board_before_move=BoardSnapshot.from_board(board_before),
         fen_before_move="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
         fen_after_move="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
     )
\ No newline at end of file
@@ -0,0 +1,405 @@
+"""
+Unit tests for the StockfishController, run against a scripted fake engine process.
+"""
+import collections
+import io
+import subprocess
+from typing import Dict, List, Optional
+
+import chess
+import pytest
+
+from chess_analyzer.config import settings
+from chess_analyzer.engine.stockfish_controller import StockfishController, _normalize_fen
+from chess_analyzer.exceptions import StockfishAnalysisError
+
+# Positions with White and with Black to move.
+WHITE_TO_MOVE_FEN = chess.STARTING_FEN
+BLACK_TO_MOVE_FEN = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+
+
+class _EngineOutput:
+    """The engine's stdout: lines queued by the fake engine, and EOF ('') once drained."""
+
+    def __init__(self):
+        self._lines = collections.deque()
+
+    def put(self, text: str) -> None:
+        self._lines.append(text + "\n")
+
+    def readline(self) -> str:
+        return self._lines.popleft() if self._lines else ""
+
+
+class _EngineInput(io.StringIO):
+    """The engine's stdin: records everything written and answers each complete command line."""
+
+    def __init__(self, process: "FakeEngineProcess"):
+        super().__init__()
+        self._process = process
+        self._pending = ""
+        self.writes: List[str] = []
+
+    def write(self, text: str) -> int:
+        super().write(text)
+        self.writes.append(text)
+        self._pending += text
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            self._process.handle_command(line)
+        return len(text)
+
+
+class FakeEngineProcess:
+    """
+    A stand-in for the Stockfish `Popen` object. 'go' replies with the lines scripted
+    for the current position; an unscripted position gets a single-line answer.
+    """
+
+    def __init__(self, scripts: Dict[str, List[str]]):
+        self.scripts = scripts
+        self.stdin = _EngineInput(self)
+        self.stdout = _EngineOutput()
+        self.returncode: Optional[int] = None
+        self.commands: List[str] = []
+        self.answers_isready = True
+        self.obeys_quit = True
+        self.killed = False
+        self._fen = ""
+
+    def handle_command(self, line: str) -> None:
+        self.commands.append(line)
+        if line == "isready" and self.answers_isready:
+            self.stdout.put("readyok")
+        elif line.startswith("position fen "):
+            self._fen = line[len("position fen "):]
+        elif line.startswith("go"):
+            for text in self.scripts.get(self._fen, ["info depth 1 multipv 1 score cp 0 pv a2a3", "bestmove a2a3"]):
+                self.stdout.put(text)
+        elif line == "quit" and self.obeys_quit:
+            self.returncode = 0
+
+    def searched_fens(self) -> List[str]:
+        """FENs of the positions the engine was asked to search, in order."""
+        return [
+            command[len("position fen "):] for command, next_command in zip(self.commands, self.commands[1:])
+            if command.startswith("position fen ") and next_command.startswith("go")
+        ]
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        if self.returncode is None:
+            raise subprocess.TimeoutExpired("stockfish", timeout)
+        return self.returncode
+
+    def kill(self) -> None:
+        self.killed = True
+        self.returncode = -9
+
+
+class FakeStockfish:
+    """A stand-in for the python-stockfish wrapper, exposing only what the controller uses."""
+
+    def __init__(self, process: FakeEngineProcess):
+        self._stockfish = process
+        self._parameters = {"MultiPV": 1}
+
+    def get_parameters(self) -> Dict[str, int]:
+        return dict(self._parameters)
+
+    def update_engine_parameters(self, parameters: Dict[str, int]) -> None:
+        self._parameters.update(parameters)
+
+    def is_fen_valid(self, fen: str) -> bool:
+        return False
+
+
+@pytest.fixture
+def make_controller(monkeypatch):
+    """
+    Builds controllers whose engine processes are `FakeEngineProcess` objects sharing one script.
+    Every process spawned is appended to the returned list.
+    """
+    def factory(scripts: Optional[Dict[str, List[str]]] = None, **kwargs):
+        spawned: List[FakeEngineProcess] = []
+
+        def create_engine(self):
+            process = FakeEngineProcess(scripts or {})
+            spawned.append(process)
+            return FakeStockfish(process)
+
+        monkeypatch.setattr(StockfishController, "_validate_stockfish_path", lambda self: None)
+        monkeypatch.setattr(StockfishController, "_create_and_verify_engine_instance", create_engine)
+        kwargs.setdefault("multipv_count", 2)
+        return StockfishController(path="stockfish", depth=10, **kwargs), spawned
+
+    return factory
+
+
+# --- Tests for reading the engine output ---
+
+def test_analyze_reads_cp_and_mate_scores_from_deepest_lines(make_controller):
+    """
+    Tests that each MultiPV line takes its latest info line, with centipawn and mate scores.
+    """
+    controller, _ = make_controller({WHITE_TO_MOVE_FEN: [
+        "info depth 1 seldepth 1 multipv 1 score cp 20 nodes 20 pv d2d4",
+        "info depth 2 seldepth 2 multipv 1 score cp 35 nodes 100 pv e2e4 e7e5",
+        "info depth 2 seldepth 2 multipv 2 score mate 3 nodes 100 pv g1f3",
+        "bestmove e2e4 ponder e7e5",
+    ]})
+
+    results = controller.analyze_fens_batch([WHITE_TO_MOVE_FEN])
+
+    assert results[WHITE_TO_MOVE_FEN] == [
+        {"Move": "e2e4", "Centipawn": 35, "Mate": None},
+        {"Move": "g1f3", "Centipawn": None, "Mate": 3},
+    ]
+
+
+def test_analyze_flips_scores_to_white_pov_when_black_moves(make_controller):
+    """
+    Tests that scores reported for Black to move are negated into White's point of view.
+    """
+    controller, _ = make_controller({BLACK_TO_MOVE_FEN: [
+        "info depth 5 multipv 1 score cp 20 pv e7e5",
+        "info depth 5 multipv 2 score mate -2 pv f7f6",
+        "bestmove e7e5",
+    ]})
+
+    results = controller.analyze_fens_batch([BLACK_TO_MOVE_FEN])
+
+    assert results[BLACK_TO_MOVE_FEN] == [
+        {"Move": "e7e5", "Centipawn": -20, "Mate": None},
+        {"Move": "f7f6", "Centipawn": None, "Mate": 2},
+    ]
+
+
+def test_analyze_skips_bound_and_extra_multipv_lines(make_controller):
+    """
+    Tests that lowerbound/upperbound scores and MultiPV indices above the requested count are ignored.
+    """
+    controller, _ = make_controller({WHITE_TO_MOVE_FEN: [
+        "info depth 8 multipv 1 score cp 30 pv e2e4",
+        "info depth 9 multipv 1 score cp 90 lowerbound pv d2d4",
+        "info depth 9 multipv 2 score cp -50 upperbound pv a2a4",
+        "info depth 8 multipv 2 score cp 10 pv c2c4",
+        "info depth 8 multipv 3 score cp 5 pv g1f3",
+        "bestmove e2e4",
+    ]})
+
+    results = controller.analyze_fens_batch([WHITE_TO_MOVE_FEN])
+
+    assert results[WHITE_TO_MOVE_FEN] == [
+        {"Move": "e2e4", "Centipawn": 30, "Mate": None},
+        {"Move": "c2c4", "Centipawn": 10, "Mate": None},
+    ]
+
+
+def test_analyze_returns_no_lines_when_there_is_no_best_move(make_controller):
+    """
+    Tests that 'bestmove (none)', given for mate or stalemate, yields an empty list of lines.
+    """
+    mated_fen = "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3"
+    controller, _ = make_controller({mated_fen: ["info depth 0 score mate 0", "bestmove (none)"]})
+
+    assert controller.analyze_fens_batch([mated_fen]) == {mated_fen: []}
+
+
+def test_analyze_keeps_results_in_order_across_pipeline_chunks(make_controller, monkeypatch):
+    """
+    Tests that every position gets its own lines, in input order, when searches span several chunks.
+    """
+    monkeypatch.setattr(settings, "ENGINE_PIPELINE_CHUNK_SIZE", 2)
+    board = chess.Board()
+    fens, scripts = [], {}
+    for score, uci in enumerate(["e2e4", "e7e5", "g1f3", "b8c6", "f1b5"]):
+        fen = board.fen()
+        fens.append(fen)
+        scripts[fen] = [f"info depth 3 multipv 1 score cp {score} pv {uci}", f"bestmove {uci}"]
+        board.push_uci(uci)
+    controller, spawned = make_controller(scripts, multipv_count=1)
+
+    results = controller.analyze_fens_batch(fens)
+
+    assert list(results) == fens
+    sign = {chess.WHITE: 1, chess.BLACK: -1}
+    for score, (fen, uci) in enumerate(zip(fens, ["e2e4", "e7e5", "g1f3", "b8c6", "f1b5"])):
+        turn = chess.Board(fen).turn
+        assert results[fen] == [{"Move": uci, "Centipawn": score * sign[turn], "Mate": None}]
+    assert spawned[0].searched_fens() == fens
+    # Searches are written to the engine one chunk at a time.
+    assert [text.count("go depth") for text in spawned[0].stdin.writes if "go depth" in text] == [2, 2, 1]
+
+
+# --- Tests for engine recovery ---
+
+def test_interrupted_batch_soft_resets_same_process(make_controller):
+    """
+    Tests that a batch aborted mid-search leaves the process running and the next batch
+    resets it over UCI instead of restarting it.
+    """
+    # The engine output ends before 'bestmove', as if the search was cut off.
+    controller, spawned = make_controller({BLACK_TO_MOVE_FEN: ["info depth 1 multipv 1 score cp 5 pv e7e5"]})
+
+    with pytest.raises(StockfishAnalysisError):
+        controller.analyze_fens_batch([BLACK_TO_MOVE_FEN])
+    results = controller.analyze_fens_batch([WHITE_TO_MOVE_FEN])
+
+    assert len(spawned) == 1
+    assert spawned[0].commands[-5:-2] == ["stop", "ucinewgame", "isready"]
+    assert results[WHITE_TO_MOVE_FEN] == [{"Move": "a2a3", "Centipawn": 0, "Mate": None}]
+
+
+def test_dead_engine_process_is_respawned(make_controller):
+    """
+    Tests that an engine process that has exited is replaced before the next batch.
+    """
+    controller, spawned = make_controller()
+    spawned[0].returncode = 1
+
+    results = controller.analyze_fens_batch([WHITE_TO_MOVE_FEN])
+
+    assert len(spawned) == 2
+    assert spawned[1].searched_fens() == [WHITE_TO_MOVE_FEN]
+    assert results[WHITE_TO_MOVE_FEN] == [{"Move": "a2a3", "Centipawn": 0, "Mate": None}]
+
+
+def test_unresponsive_engine_is_restarted(make_controller, monkeypatch):
+    """
+    Tests that an engine which does not answer 'isready' in time is stopped and replaced.
+    """
+    monkeypatch.setattr(settings, "ENGINE_READY_TIMEOUT_S", 0.2)
+    controller, spawned = make_controller()
+    spawned[0].answers_isready = False
+
+    results = controller.analyze_fens_batch([WHITE_TO_MOVE_FEN])
+
+    assert len(spawned) == 2
+    assert spawned[0].commands[-1] == "quit" and spawned[0].returncode == 0
+    assert spawned[0].searched_fens() == []
+    assert results[WHITE_TO_MOVE_FEN] == [{"Move": "a2a3", "Centipawn": 0, "Mate": None}]
+
+
+def test_failed_is_ready_stops_engine(make_controller, monkeypatch):
+    """
+    Tests that is_ready() stops an engine which does not answer, so no reader is left on its stdout.
+    """
+    monkeypatch.setattr(settings, "ENGINE_READY_TIMEOUT_S", 0.2)
+    controller, spawned = make_controller()
+    spawned[0].answers_isready = False
+
+    assert not controller.is_ready()
+    assert spawned[0].commands[-1] == "quit" and spawned[0].returncode == 0
+    assert not controller.is_ready()
+
+    controller.analyze_fens_batch([WHITE_TO_MOVE_FEN])
+    assert len(spawned) == 2
+
+
+# --- Tests for stopping the engine process ---
+
+def test_stop_engine_process_kills_engine_that_ignores_quit():
+    """
+    Tests that an engine which does not exit after 'quit' is killed, without raising.
+    """
+    process = FakeEngineProcess({})
+    process.obeys_quit = False
+
+    StockfishController._stop_engine_process(process)
+
+    assert process.commands == ["quit"]
+    assert process.killed
+
+
+def test_stop_engine_process_survives_engine_that_cannot_be_killed(monkeypatch):
+    """
+    Tests that a failed kill is logged rather than raised.
+    """
+    process = FakeEngineProcess({})
+    process.obeys_quit = False
+    monkeypatch.setattr(process, "kill", lambda: setattr(process, "killed", True))
+
+    StockfishController._stop_engine_process(process)
+
+    assert process.killed and process.returncode is None
+
+
+# --- Tests for FEN normalization ---
+
+@pytest.mark.parametrize("fen, expected", [
+    # Full FENs differing only in their move counters share one key.
+    ("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+     "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq -"),
+    ("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 12 40",
+     "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq -"),
+    # The en passant square is part of the position and is kept.
+    ("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+     "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6"),
+    # 4-field FENs are already normalized.
+    ("8/8/8/8/8/8/8/K6k w - -", "8/8/8/8/8/8/8/K6k w - -"),
+    # Malformed input is passed through unchanged.
+    ("not a fen", "not a fen"),
+    ("8/8/8/8/8/8/8/K6k w - - x y", "8/8/8/8/8/8/8/K6k w - - x y"),
+    ("8/8/8/8/8/8/8/K6k w - - 0", "8/8/8/8/8/8/8/K6k w - - 0"),
+    ("", ""),
+])
+def test_normalize_fen(fen, expected):
+    """
+    Tests that move counters are stripped from FENs used as memo keys.
+    """
+    assert _normalize_fen(fen) == expected
+
+
+# --- Tests for the analysis memo ---
+
+def test_memo_hit_skips_engine(make_controller):
+    """
+    Tests that a position analyzed in an earlier batch, even with other move counters, is not searched again.
+    """
+    controller, spawned = make_controller()
+    later_fen = WHITE_TO_MOVE_FEN.replace(" 0 1", " 4 3")
+
+    first = controller.analyze_fens_batch([WHITE_TO_MOVE_FEN])
+    second = controller.analyze_fens_batch([WHITE_TO_MOVE_FEN, later_fen])
+
+    assert spawned[0].searched_fens() == [WHITE_TO_MOVE_FEN]
+    assert second == {WHITE_TO_MOVE_FEN: first[WHITE_TO_MOVE_FEN], later_fen: first[WHITE_TO_MOVE_FEN]}
+
+
+def test_memo_evicts_least_recently_used_position(make_controller):
+    """
+    Tests that a full memo drops the position used least recently, not the oldest inserted.
+    """
+    controller, spawned = make_controller(memo_cache_size=2)
+    board = chess.Board()
+    fen_a = board.fen()
+    board.push_uci("e2e4")
+    fen_b = board.fen()
+    board.push_uci("e7e5")
+    fen_c = board.fen()
+
+    controller.analyze_fens_batch([fen_a, fen_b])
+    controller.analyze_fens_batch([fen_a])  # A becomes the most recently used.
+    controller.analyze_fens_batch([fen_c])  # Evicts B.
+    controller.analyze_fens_batch([fen_a, fen_b])
+
+    assert spawned[0].searched_fens() == [fen_a, fen_b, fen_c, fen_b]
+
+
+def test_memo_serves_positions_without_moves(make_controller):
+    """
+    Tests that an empty analysis (mate or stalemate) is memoized as a hit rather than searched again.
+    """
+    stalemate_fen = "7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"
+    controller, spawned = make_controller({stalemate_fen: ["info depth 0 score cp 0", "bestmove (none)"]})
+    progress = []
+
+    controller.analyze_fens_batch([stalemate_fen])
+    results = controller.analyze_fens_batch([stalemate_fen], progress_callback=lambda: progress.append(1))
+
+    assert results == {stalemate_fen: []}
+    assert spawned[0].searched_fens() == [stalemate_fen]
+    assert progress == [1]
@@ -0,0 +1,178 @@
+"""
+Unit tests for the StockfishPool, using fake controllers in place of engine processes.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+from chess_analyzer.engine import stockfish_pool
+from chess_analyzer.engine.stockfish_pool import StockfishPool
+from chess_analyzer.exceptions import StockfishAnalysisError, StockfishError
+
+
+class FakeController:
+    """
+    A stand-in for `StockfishController`. Each FEN's lines name the FEN itself, and an
+    optional `on_batch` hook can block or fail a worker's batch.
+    """
+
+    instances: List["FakeController"] = []
+
+    def __init__(self, path: str, depth: int, **kwargs):
+        self.kwargs = kwargs
+        self.index = len(FakeController.instances)
+        self.shards: List[List[str]] = []
+        self.on_batch: Optional[Callable[["FakeController"], None]] = None
+        self.closed = False
+        FakeController.instances.append(self)
+
+    def get_stockfish_version(self) -> str:
+        return "16"
+
+    def is_ready(self) -> bool:
+        return not self.closed
+
+    def analyze_fens_batch(
+        self,
+        fen_list: List[str],
+        shutdown_event: Optional[threading.Event] = None,
+        progress_callback: Optional[Callable[[], None]] = None,
+    ) -> Dict[str, Any]:
+        self.shards.append(list(fen_list))
+        if self.on_batch:
+            self.on_batch(self)
+        results = {}
+        for fen in fen_list:
+            results[fen] = [{"Move": fen}]
+            if progress_callback:
+                progress_callback()
+        return results
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    """Builds pools of `FakeController` workers; the pool's workers are `FakeController.instances`."""
+    FakeController.instances = []
+    monkeypatch.setattr(stockfish_pool, "StockfishController", FakeController)
+    pools: List[StockfishPool] = []
+
+    def factory(num_workers: int, **kwargs) -> StockfishPool:
+        pool = StockfishPool(path="stockfish", depth=10, num_workers=num_workers, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        pool.close()
+
+
+def test_pool_shards_unique_fens_round_robin(make_pool):
+    """
+    Tests that repeated FENs are dispatched once and unique FENs are dealt round-robin to the workers.
+    """
+    pool = make_pool(2, stockfish_hash_mb=256)
+
+    results = pool.analyze_fens_batch(["a", "b", "a", "c", "d", "e", "b"])
+
+    assert [worker.shards for worker in FakeController.instances] == [[["a", "c", "e"]], [["b", "d"]]]
+    assert results == {fen: [{"Move": fen}] for fen in ["a", "b", "c", "d", "e"]}
+    # Each worker runs a single-threaded engine with its share of the hash.
+    assert all(worker.kwargs["stockfish_threads"] == 1 for worker in FakeController.instances)
+    assert all(worker.kwargs["stockfish_hash_mb"] == 128 for worker in FakeController.instances)
+
+
+def test_pool_reports_progress_on_calling_thread(make_pool):
+    """
+    Tests that progress from every worker is reported once per unique FEN, on the calling thread only.
+    """
+    pool = make_pool(3)
+    callback_threads = []
+
+    pool.analyze_fens_batch(
+        ["a", "b", "c", "d", "e", "a"],
+        progress_callback=lambda: callback_threads.append(threading.get_ident()),
+    )
+
+    assert callback_threads == [threading.get_ident()] * 5
+
+
+def test_pool_reraises_first_worker_error_after_other_shards_finish(make_pool):
+    """
+    Tests that the first worker failure is raised once every other shard has finished.
+    """
+    pool = make_pool(2)
+    first_failed = threading.Event()
+    second_finished = threading.Event()
+
+    def fail_first(worker: FakeController) -> None:
+        first_failed.set()
+        raise StockfishAnalysisError("first worker failed")
+
+    def fail_later(worker: FakeController) -> None:
+        first_failed.wait(timeout=5)
+        time.sleep(0.05)
+        second_finished.set()
+        raise ValueError("second worker failed")
+
+    FakeController.instances[0].on_batch = fail_first
+    FakeController.instances[1].on_batch = fail_later
+
+    with pytest.raises(StockfishAnalysisError, match="first worker failed"):
+        pool.analyze_fens_batch(["a", "b"])
+    assert second_finished.is_set()
+
+
+def test_pool_wraps_unexpected_worker_errors(make_pool):
+    """
+    Tests that a non-Stockfish worker exception surfaces as a StockfishAnalysisError.
+    """
+    pool = make_pool(2)
+
+    def fail(worker: FakeController) -> None:
+        raise ValueError("boom")
+
+    FakeController.instances[1].on_batch = fail
+
+    with pytest.raises(StockfishAnalysisError, match="boom"):
+        pool.analyze_fens_batch(["a", "b", "c"])
+
+
+def test_pool_close_shuts_down_every_worker(make_pool):
+    """
+    Tests that closing the pool closes every controller and rejects further work.
+    """
+    pool = make_pool(3)
+    assert pool.is_ready()
+
+    pool.close()
+    pool.close()
+
+    assert all(worker.closed for worker in FakeController.instances)
+    assert not pool.is_ready()
+    with pytest.raises(StockfishError):
+        pool.analyze_fens_batch(["a"])
+
+
+def test_pool_zero_workers_means_one_per_cpu(make_pool, monkeypatch):
+    """
+    Tests that a worker count of 0 starts one engine per CPU core.
+    """
+    monkeypatch.setattr(stockfish_pool.os, "cpu_count", lambda: 3)
+
+    pool = make_pool(0)
+
+    assert pool.num_workers == 3 and len(FakeController.instances) == 3
+
+
+def test_pool_rejects_negative_worker_count(make_pool):
+    """
+    Tests that a negative worker count is an error rather than a single-worker pool.
+    """
+    with pytest.raises(ValueError):
+        make_pool(-2)
+    assert FakeController.instances == []
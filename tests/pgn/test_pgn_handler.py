@@ -0,0 +1,286 @@
+"""
+Unit tests for the PGNHandler.
+"""
+import io
+
+import chess
+import chess.pgn
+import pytest
+
+from chess_analyzer.exceptions import PGNImportError
+from chess_analyzer.pgn.pgn_handler import _CASTLING_FEN_CACHE, PGNHandler
+
+
+@pytest.mark.parametrize("headers, expected_id", [
+    ({"Site": "https://lichess.org/AbCd1234"}, "AbCd1234"),
+    ({"Site": "https://www.chess.com/game/live/123456789"}, "123456789"),
+    ({"Site": "https://www.chess.com/analysis/game/live/987654"}, "987654"),
+    ({"Site": "?", "LichessURL": "https://lichess.org/wxyz9876"}, "wxyz9876"),
+    ({"Site": "https://lichess.org/AbCd1234/black#12"}, "AbCd1234"),
+    # Lichess IDs are 8-12 ASCII letters or digits; longer runs are cut at 12.
+    ({"Site": "https://lichess.org/AbCdEfGh12345"}, "AbCdEfGh1234"),
+    ({"Site": "https://lichess.org/short", "GameId": "fallback"}, "fallback"),
+    # The leftmost URL wins, whichever site it belongs to.
+    ({"Site": "chess.com/game/live/42 via lichess.org/AbCd1234"}, "42"),
+    ({"Site": "lichess.org/study lichess.org/AbCd1234"}, "AbCd1234"),
+    ({"Site": "Local club", "GameId": "club-42"}, "club-42"),
+    ({"Site": "Local club", "GameId": "?"}, None),
+    ({}, None),
+])
+def test_extract_game_id(headers, expected_id):
+    """
+    Tests that game IDs are extracted from site URLs, falling back to the GameId tag.
+    """
+    assert PGNHandler().extract_game_id(chess.pgn.Headers(headers)) == expected_id
+
+
+def test_collect_move_data_fens_match_board_fen():
+    """
+    Tests that collected FENs are identical to python-chess's own FENs,
+    including castling rights and legal en passant squares.
+    """
+    game = chess.pgn.Game()
+    node = game
+    for uci in ["e2e4", "a7a6", "e4e5", "d7d5", "e5d6", "e8d7", "g1f3", "h7h5", "f1e2", "h8h6", "e1g1"]:
+        node = node.add_variation(chess.Move.from_uci(uci))
+
+    move_data_list, unique_fens = PGNHandler().collect_move_data_and_fens(game)
+
+    board = game.board()
+    for move_data in move_data_list:
+        assert move_data.fen_before_move == board.fen()
+        board.push(move_data.actual_move_obj)
+        assert move_data.fen_after_move == board.fen()
+    assert list(unique_fens)[0] == chess.STARTING_FEN
+    assert len(unique_fens) == len(move_data_list) + 1
+
+    # A setup position whose castling rights do not match its pieces must not
+    # change the castling field of the games collected after it.
+    _CASTLING_FEN_CACHE.clear()
+    setup_game = chess.pgn.read_game(io.StringIO(
+        '[SetUp "1"]\n[FEN "r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K3 w KQkq - 0 1"]\n\n1. a3 *\n'
+    ))
+    for collected_game in (setup_game, game):
+        move_data_list, unique_fens = PGNHandler().collect_move_data_and_fens(collected_game)
+        board = collected_game.board()
+        assert list(unique_fens)[0] == board.fen()
+        for move_data in move_data_list:
+            assert move_data.fen_before_move == board.fen()
+            board.push(move_data.actual_move_obj)
+            assert move_data.fen_after_move == board.fen()
+
+
+def _make_game(site: str) -> chess.pgn.Game:
+    game = chess.pgn.Game()
+    game.headers["Site"] = site
+    game.add_variation(chess.Move.from_uci("e2e4"))
+    return game
+
+
+def test_processed_game_ids_are_indexed_on_flush(tmp_path):
+    """
+    Tests that exported games are separated correctly and that flushed game IDs are
+    recorded in the sidecar index and read back from it.
+    """
+    handler = PGNHandler()
+    output_path = str(tmp_path / "out.pgn")
+    index_path = handler.get_processed_ids_index_path(output_path)
+    assert handler.get_processed_game_ids(output_path) == set()
+
+    with open(output_path, "a+", encoding="utf-8") as outfile, open(index_path, "a", encoding="utf-8") as index:
+        needs_separator = handler.export_annotated_game(_make_game("https://lichess.org/AbCd1234"), outfile, False)
+        needs_separator = handler.export_annotated_game(_make_game("Local club"), outfile, needs_separator)
+        handler.flush_exports(outfile, index, ["AbCd1234"])
+
+    with open(output_path, encoding="utf-8") as f:
+        assert f.read().count("*\n\n[Event") == 1
+    with open(index_path, encoding="utf-8") as f:
+        index_lines = f.read().splitlines()
+    assert index_lines[0] == "AbCd1234"
+    assert index_lines[1].startswith(PGNHandler._IDS_INDEX_STAMP_PREFIX) and len(index_lines) == 2
+    assert handler.get_processed_game_ids(output_path) == {"AbCd1234"}
+
+
+def test_processed_game_ids_builds_index_from_existing_output(tmp_path):
+    """
+    Tests that an output PGN without an index is scanned once and the index is created.
+    """
+    handler = PGNHandler()
+    output_path = str(tmp_path / "out.pgn")
+    with open(output_path, "a+", encoding="utf-8") as outfile:
+        handler.export_annotated_game(_make_game("https://www.chess.com/game/live/123"), outfile, False)
+
+    assert handler.get_processed_game_ids(output_path) == {"123"}
+    with open(handler.get_processed_ids_index_path(output_path), encoding="utf-8") as f:
+        assert f.read().splitlines()[0] == "123"
+
+    # The rebuilt index is trusted by the next run.
+    handler._stream_games_headers_only = lambda path: pytest.fail("output should not be rescanned")
+    assert handler.get_processed_game_ids(output_path) == {"123"}
+
+
+@pytest.mark.parametrize("index_text", [
+    # An index written before the output stamp existed.
+    "AbCd1234\n",
+    # An index whose stamp belongs to a different version of the output.
+    "AbCd1234\n#output 1 1\n",
+])
+def test_processed_game_ids_rescans_output_not_matching_index(tmp_path, index_text):
+    """
+    Tests that an index whose last stamp does not match the output PGN is replaced by a rescan.
+    """
+    handler = PGNHandler()
+    output_path = tmp_path / "out.pgn"
+    output_path.write_text('[Site "https://lichess.org/wxyz9876"]\n\n1. e4 *\n\n', encoding="utf-8")
+    (tmp_path / "out.pgn.ids").write_text(index_text, encoding="utf-8")
+
+    assert handler.get_processed_game_ids(str(output_path)) == {"wxyz9876"}
+
+
+def test_processed_game_ids_ignores_index_of_truncated_output(tmp_path):
+    """
+    Tests that emptying the output PGN invalidates its index, so no games are skipped.
+    """
+    handler = PGNHandler()
+    output_path = str(tmp_path / "out.pgn")
+    index_path = handler.get_processed_ids_index_path(output_path)
+    assert handler.get_processed_game_ids(output_path) == set()
+    with open(output_path, "a+", encoding="utf-8") as outfile, open(index_path, "a", encoding="utf-8") as index:
+        handler.export_annotated_game(_make_game("https://lichess.org/AbCd1234"), outfile, False)
+        handler.flush_exports(outfile, index, ["AbCd1234"])
+    assert PGNHandler().get_processed_game_ids(output_path) == {"AbCd1234"}
+
+    open(output_path, "w").close()
+
+    assert handler.get_processed_game_ids(output_path) == set()
+
+
+def test_processed_game_ids_rescans_after_partial_scan(tmp_path):
+    """
+    Tests that an index is not stamped as complete after a failed scan, even once the
+    run appends new IDs to it, so the next run scans the output again.
+    """
+    handler = PGNHandler()
+    output_path = str(tmp_path / "out.pgn")
+    with open(output_path, "a+", encoding="utf-8") as outfile:
+        needs_separator = handler.export_annotated_game(_make_game("https://lichess.org/AbCd1234"), outfile, False)
+        handler.export_annotated_game(_make_game("https://lichess.org/BbCd1234"), outfile, needs_separator)
+
+    def failing_scan(path):
+        yield chess.pgn.Headers(Site="https://lichess.org/AbCd1234")
+        raise PGNImportError("read error")
+
+    handler._stream_games_headers_only = failing_scan
+    assert handler.get_processed_game_ids(output_path) == {"AbCd1234"}
+
+    index_path = handler.get_processed_ids_index_path(output_path)
+    with open(output_path, "a+", encoding="utf-8") as outfile, open(index_path, "a", encoding="utf-8") as index:
+        handler.export_annotated_game(_make_game("https://lichess.org/wxyz9876"), outfile, True)
+        handler.flush_exports(outfile, index, ["wxyz9876"])
+
+    next_run = PGNHandler()
+    scans = []
+    original_scan = next_run._stream_games_headers_only
+    next_run._stream_games_headers_only = lambda path: scans.append(path) or original_scan(path)
+
+    assert next_run.get_processed_game_ids(output_path) == {"AbCd1234", "BbCd1234", "wxyz9876"}
+    assert scans == [output_path]
+
+
+def test_processed_game_ids_ignores_index_without_output(tmp_path):
+    """
+    Tests that a leftover index is discarded when its output PGN no longer exists.
+    """
+    handler = PGNHandler()
+    output_path = str(tmp_path / "out.pgn")
+    index_path = tmp_path / "out.pgn.ids"
+    index_path.write_text("AbCd1234\n", encoding="utf-8")
+
+    assert handler.get_processed_game_ids(output_path) == set()
+    assert not index_path.exists()
+
+
+def test_stream_games_skips_processed_ids(tmp_path):
+    """
+    Tests that games with an already processed ID are skipped and reported, while the rest are parsed fully.
+    """
+    pgn_path = tmp_path / "in.pgn"
+    pgn_path.write_text(
+        '[Site "https://lichess.org/aaaaaaaa"]\n\n1. e4 e5 2. Nf3 *\n\n'
+        '[Site "https://lichess.org/bbbbbbbb"]\n\n1. d4 { a comment } d5 *\n\n'
+        '[Site "https://lichess.org/cccccccc"]\n\n1. c4 *\n',
+        encoding="utf-8",
+    )
+    skipped = []
+
+    games = list(PGNHandler().stream_games(
+        str(pgn_path), skip_ids={"bbbbbbbb"}, skipped_callback=lambda: skipped.append(True)
+    ))
+
+    assert [g.headers["Site"][-8:] for g in games] == ["aaaaaaaa", "cccccccc"]
+    assert [len(list(g.mainline_moves())) for g in games] == [3, 1]
+    assert skipped == [True]
+
+
+def test_export_appends_to_output_without_trailing_blank_line(tmp_path):
+    """
+    Tests that appending to an output PGN written without a trailing blank line keeps the games separated.
+    """
+    handler = PGNHandler()
+    output_path = tmp_path / "out.pgn"
+    output_path.write_text('[Site "https://lichess.org/aaaaaaaa"]\n\n1. e4 *', encoding="utf-8")
+
+    needs_separator = handler.needs_game_separator(str(output_path))
+    with open(output_path, "a+", encoding="utf-8") as outfile:
+        handler.export_annotated_game(_make_game("https://lichess.org/bbbbbbbb"), outfile, needs_separator)
+
+    assert needs_separator
+    assert not handler.needs_game_separator(str(output_path))
+    assert not handler.needs_game_separator(str(tmp_path / "missing.pgn"))
+    with open(output_path, encoding="utf-8") as f:
+        games = [chess.pgn.read_game(f), chess.pgn.read_game(f)]
+    assert [g.headers["Site"][-8:] for g in games] == ["aaaaaaaa", "bbbbbbbb"]
+
+
+def test_board_snapshot_materializes_stackless_copy():
+    """
+    Tests that a board rebuilt from a snapshot equals a stackless copy and is independent of the original.
+    """
+    from chess_analyzer.types import BoardSnapshot
+
+    board = chess.Board("r3k2r/pp1p1ppp/8/2pP4/8/8/PPP2PPP/R3K2R w KQkq c6 0 12")
+    snapshot = BoardSnapshot.from_board(board)
+    rebuilt = snapshot.to_board()
+
+    assert rebuilt == board.copy(stack=False)
+    assert rebuilt.fen() == board.fen()
+    assert rebuilt.move_stack == []
+
+    rebuilt.push_san("dxc6")
+    rebuilt.pop()
+    rebuilt.push_san("O-O")
+    assert board.fen() == "r3k2r/pp1p1ppp/8/2pP4/8/8/PPP2PPP/R3K2R w KQkq c6 0 12"
+    assert snapshot.to_board().fen() == board.fen()
+
+
+def test_collected_move_data_materializes_position_before_move(sample_game):
+    """
+    Tests that every collected move rebuilds the board its FEN was taken from.
+    """
+    move_data_list, _ = PGNHandler().collect_move_data_and_fens(sample_game)
+
+    for move_data in move_data_list:
+        board = move_data.materialize_board()
+        assert board.fen() == move_data.fen_before_move
+        assert board == move_data.pgn_node.parent.board()
+
+
+def test_collected_fens_are_shared_across_games(sample_game):
+    """
+    Tests that identical positions from different games share one interned FEN string.
+    """
+    handler = PGNHandler()
+    first, _ = handler.collect_move_data_and_fens(sample_game)
+    second, _ = handler.collect_move_data_and_fens(sample_game)
+
+    assert first[3].fen_after_move is second[3].fen_after_move
@@ -0,0 +1,70 @@
+"""
+Unit tests for the ReportGenerator.
+"""
+import csv
+from collections import Counter
+
+from chess_analyzer.reporting.report_generator import ReportGenerator
+from chess_analyzer.types import GameSummary
+
+
+def _make_summary(game_id: str, player_cpls) -> GameSummary:
+    return GameSummary(
+        game_id=game_id,
+        analyzed_player_name="Player A",
+        player_color_str="White",
+        player_cpls=list(player_cpls),
+        move_classification_counts=Counter({"Best": 2, "Mistake": 1}),
+        engine_top1_match_count=2,
+        engine_topN_match_count=3,
+        pgn_headers={"Event": "Test Game", "White": "Player A", "Black": "Player B", "Annotator": "x"},
+    )
+
+
+def test_generate_csv_report_writes_columns_in_header_order(tmp_path):
+    """
+    Tests that each row lines up with the CSV header, that missing PGN tags are left
+    blank, and that summaries without moves are skipped.
+    """
+    report_path = tmp_path / "report.csv"
+    summaries = [_make_summary("game1", [0, 0, 150]), _make_summary("game2", [])]
+
+    ReportGenerator().generate_csv_report(summaries, str(report_path))
+
+    with open(report_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    assert len(rows) == 1
+    row = rows[0]
+    assert list(row) == ReportGenerator._CSV_HEADERS
+    assert row["GameID"] == "game1"
+    assert row["AverageCPL"] == "50.0"
+    assert row["TotalMoves"] == "3"
+    assert (row["Best"], row["Mistake"], row["Blunder"]) == ("2", "1", "0")
+    assert row["EngineTop1MatchPercent"] == "66.7"
+    assert row["EngineTopNMatchPercent"] == "100.0"
+    assert (row["Event"], row["White"], row["Round"]) == ("Test Game", "Player A", "")
+
+
+def test_calculate_accuracies_matches_scalar_accuracy():
+    """
+    Tests that the batched accuracy calculation agrees with the per-game one.
+    """
+    generator = ReportGenerator()
+    average_cpls = [0.0, 12.5, 35.0, 80.0, 250.0, 5000.0]
+
+    assert generator._calculate_accuracies(average_cpls) == [
+        generator._calculate_accuracy(average_cpl) for average_cpl in average_cpls
+    ]
+    assert generator._calculate_accuracies([]) == []
+
+
+def test_generate_csv_report_skips_file_without_scored_games(tmp_path):
+    """
+    Tests that no report file is created when no summary has any moves.
+    """
+    report_path = tmp_path / "report.csv"
+
+    ReportGenerator().generate_csv_report([_make_summary("game1", [])], str(report_path))
+
+    assert not report_path.exists()
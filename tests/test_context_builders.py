@@ -2,12 +2,23 @@
 """
 Unit tests for the functions in context_builders.py.
 """
+from collections import OrderedDict
+
 import pytest
 import chess
 
+from chess_analyzer import context_builders
+
 # Import the functions and types we are testing
-from chess_analyzer.context_builders import get_score_from_line, build_move_analysis_context, build_game_summary
-from chess_analyzer.types import ClassificationResult, GameSummary
+from chess_analyzer.context_builders import (
+    get_score_from_line,
+    score_lines_batch,
+    build_move_analysis_context,
+    build_annotation_context,
+    get_lines_per_ply,
+    build_game_summary,
+)
+from chess_analyzer.types import ClassificationResult, GameSummary, PlayerMoveTally
 from chess_analyzer.config import settings
 
 # --- Tests for get_score_from_line ---
@@ -31,6 +42,9 @@ from chess_analyzer.config import settings
     ({"Centipawn": "invalid"}, chess.WHITE, None, False, None),
     # Test case 9: Mate 0 should be treated as a draw
     ({"Mate": 0}, chess.WHITE, 0.0, False, None),
+    # Test case 10: Numeric strings (e.g., from older cache entries) are still parsed
+    ({"Centipawn": "-40"}, chess.WHITE, -40.0, False, None),
+    ({"Mate": "2"}, chess.BLACK, -29998.0, True, -2),
 ])
 def test_get_score_from_line(line, perspective, expected_score, expected_is_mate, expected_mate_in):
     """
@@ -46,28 +60,69 @@ def test_get_score_from_line(line, perspective, expected_score, expected_is_mate
     assert is_mate == expected_is_mate
     assert mate_in == expected_mate_in
 
+@pytest.mark.parametrize("perspective", [chess.WHITE, chess.BLACK])
+def test_score_lines_batch_matches_single_line_scoring(perspective):
+    """
+    Tests that score_lines_batch returns the same values as scoring each line individually.
+    """
+    lines = [
+        {"Centipawn": 125, "Move": "e2e4"},
+        {"Mate": 3, "Move": "d1h5"},
+        {"Mate": -2, "Move": "g1f3"},
+        None,
+        {"Centipawn": "invalid"},
+        {"Mate": 0},
+    ]
+
+    scores, is_mates, mate_moves = score_lines_batch(lines, perspective)
+
+    assert list(zip(scores, is_mates, mate_moves)) == [get_score_from_line(line, perspective) for line in lines]
+
+# --- Tests for SAN conversion ---
+
+def test_cached_san_evicts_least_recently_used(monkeypatch):
+    """
+    Tests that a SAN cache hit refreshes the entry, so the least recently used one is evicted.
+    """
+    monkeypatch.setattr(context_builders, "_SAN_CACHE", OrderedDict())
+    monkeypatch.setattr(context_builders, "_SAN_CACHE_SIZE", 2)
+    board = chess.Board()
+
+    context_builders._cached_san(board, "e2e4")
+    context_builders._cached_san(board, "d2d4")
+    context_builders._cached_san(board, "e2e4")  # e2e4 becomes the most recently used.
+    context_builders._cached_san(board, "g1f3")  # Evicts d2d4.
+
+    assert [key[-1] for key in context_builders._SAN_CACHE] == ["e2e4", "g1f3"]
+
+def test_cached_san_distinguishes_en_passant_square(monkeypatch):
+    """
+    Tests that positions with the same pieces but a different en passant square do not share SAN entries.
+    """
+    monkeypatch.setattr(context_builders, "_SAN_CACHE", OrderedDict())
+    with_ep = chess.Board("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2")
+    without_ep = chess.Board("4k3/8/8/3pP3/8/8/8/4K3 w - - 0 2")
+
+    assert context_builders._cached_san(with_ep, "e5d6") == "exd6"
+    assert context_builders._cached_san(without_ep, "e5d6") == "d6"
+
 # --- Tests for build_move_analysis_context ---
 
 def test_build_move_analysis_context(sample_move_data_e4):
     """
     Tests that build_move_analysis_context correctly assembles the context object.
     """
-    # Arrange: Create a sample analysis dictionary
-    # This represents the engine's output for the positions before and after 1. e4
-    analyses = {
-        # FEN before 1. e4 (starting position)
-        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1": [
-            {"Move": "e2e4", "Centipawn": 50}, # Best move
-            {"Move": "g1f3", "Centipawn": 45}, # Second best
-        ],
-        # FEN after 1. e4
-        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1": [
-            {"Move": "c7c5", "Centipawn": -50}, # Best response for Black (so -50 for White)
-        ],
-    }
-    
+    # Arrange: Engine lines (White's POV) for the positions before and after 1. e4
+    lines_before = [
+        {"Move": "e2e4", "Centipawn": 50}, # Best move
+        {"Move": "g1f3", "Centipawn": 45}, # Second best
+    ]
+    lines_after = [
+        {"Move": "c7c5", "Centipawn": 40}, # Black's best response; White keeps +40
+    ]
+
     # Act: Call the function we are testing
-    context = build_move_analysis_context(sample_move_data_e4, analyses, multipv_setting=2)
+    context = build_move_analysis_context(sample_move_data_e4, lines_before, lines_after, multipv_setting=2)
 
     # Assert: Check that the context object is built correctly
     # Note: The player is White, so all evals should be from White's POV.
@@ -80,16 +135,66 @@ def test_build_move_analysis_context(sample_move_data_e4):
     assert context.is_mate_second_best_move is False
     assert context.eval_before_move == pytest.approx(50.0) # Should be same as best move
 
-    # Eval for the player's actual move (1. e4)
-    # The eval *after* 1. e4 is -50 from Black's best response perspective.
-    # The get_score_from_line function converts this to +50 from White's perspective.
-    assert context.eval_player_move == pytest.approx(50.0)
+    # Eval for the player's actual move (1. e4), from White's perspective
+    assert context.eval_player_move == pytest.approx(40.0)
     assert context.is_mate_player_move is False
     
     # Check supporting data
     assert context.player_move_uci == "e2e4"
+    assert context.engine_top_lines == lines_before
     assert context.brilliant_criteria == settings.BRILLIANT_CRITERIA
 
+# --- Tests for get_lines_per_ply ---
+
+def test_get_lines_per_ply(sample_move_data_e4):
+    """
+    Tests that engine lines are looked up per ply, with None for missing positions.
+    """
+    lines_start = [{"Move": "e2e4", "Centipawn": 50}]
+    analyses = {sample_move_data_e4.fen_before_move: lines_start}
+
+    lines_before, lines_after = get_lines_per_ply([sample_move_data_e4], analyses)
+
+    assert lines_before == [lines_start]
+    assert lines_after == [None]
+
+# --- Tests for build_annotation_context ---
+
+def test_build_annotation_context_formats_engine_lines(sample_move_data_e4):
+    """
+    Tests that engine lines are converted to SAN, including each line's PV.
+    """
+    analyses = {
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1": [
+            {"Move": "e2e4", "Centipawn": 50, "PV": ["e2e4", "e7e5", "g1f3"]},
+            {"Move": "g1f3", "Centipawn": 45, "PV": ["g1f3", "d7d5"]},
+        ],
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1": [
+            {"Move": "c7c5", "Centipawn": 40},
+        ],
+    }
+    result = ClassificationResult("Best", 0, 0, is_engine_top_choice=True)
+    board_fen_before = sample_move_data_e4.materialize_board().fen()
+
+    context = build_annotation_context(
+        move_data=sample_move_data_e4, result=result,
+        lines_before=analyses[sample_move_data_e4.fen_before_move],
+        lines_after=analyses[sample_move_data_e4.fen_after_move],
+        analysis_depth=18, multipv_setting=2,
+        prepare_comment_func=lambda comment: ("", ""),
+    )
+
+    assert [line.move_san for line in context.engine_lines] == ["e4", "Nf3"]
+    assert [line.eval_str for line in context.engine_lines] == ["0.50", "0.45"]
+    assert context.engine_lines[0].is_best_line
+    # PV SANs are computed lazily on first access.
+    assert "pv_san_list" not in vars(context.engine_lines[1])
+    assert context.engine_lines[0].pv_san_list == ["e4", "e5", "Nf3"]
+    assert context.engine_lines[1].pv_san_list == ["Nf3", "d5"]
+    assert context.eval_after_move_wpov_str == "[%eval 0.40,18]"
+    # The move data's board must not be mutated while building PVs.
+    assert sample_move_data_e4.materialize_board().fen() == board_fen_before
+
 # --- Tests for build_game_summary ---
 
 def test_build_game_summary_for_white(sample_game):
@@ -130,4 +235,42 @@ def test_build_game_summary_player_not_in_game(sample_game):
     Tests that build_game_summary returns None when the target player is not in the game.
     """
     summary = build_game_summary(sample_game, "game1", "Player C", [])
-    assert summary is None
\ No newline at end of file
+    assert summary is None
+
+def test_build_game_summary_matches_player_case_insensitively(sample_game):
+    """
+    Tests that the target player is matched case-insensitively, with or without a precomputed key.
+    """
+    results = [ClassificationResult("Best", 0, 0), ClassificationResult("Good (CPL: 20)", 20, 20)]
+
+    summary = build_game_summary(sample_game, "game1", "PLAYER b", results)
+    summary_with_key = build_game_summary(sample_game, "game1", "PLAYER b", results, target_player_key="player b")
+
+    assert summary is not None
+    assert summary.player_color_str == "Black"
+    assert summary.player_cpls == [20]
+    assert summary == summary_with_key
+
+def test_build_game_summary_without_player_moves(sample_game):
+    """
+    Tests that build_game_summary returns None when the targeted player made no moves.
+    """
+    summary = build_game_summary(sample_game, "game1", "Player B", [ClassificationResult("Best", 0, 0)])
+    assert summary is None
+
+def test_player_move_tally_accumulates_results():
+    """
+    Tests that a tally collects CPLs, short classification names and engine matches.
+    """
+    tally = PlayerMoveTally()
+    for result in [
+        ClassificationResult("Best", 0, 0, is_engine_top_choice=True, is_engine_top_n_choice=True),
+        ClassificationResult("Good (CPL: 30)", 30, 30, is_engine_top_n_choice=True),
+    ]:
+        tally.add(result)
+
+    assert tally.cpls == [0, 30]
+    assert tally.acpl == 15.0
+    assert tally.classification_counts == {"Best": 1, "Good": 1}
+    assert (tally.engine_top1_match_count, tally.engine_topN_match_count) == (1, 2)
+    assert PlayerMoveTally().acpl == 0.0
@@ -0,0 +1,46 @@
+"""
+Unit tests for the pipeline's progress reporting adapter.
+"""
+from chess_analyzer.pipeline import TqdmProgressReporter
+
+
+class _RecordingBar:
+    """A stand-in for a tqdm bar that records the calls made to it."""
+    def __init__(self):
+        self.updates = []
+        self.calls = []
+
+    def update(self, n):
+        self.updates.append(n)
+
+    def reset(self, total):
+        self.calls.append(("reset", total))
+
+    def set_description_str(self, desc):
+        self.calls.append(("description", desc))
+
+    def close(self):
+        self.calls.append(("close",))
+
+
+def test_tqdm_progress_reporter_batches_updates():
+    """
+    Tests that single-step updates reach the bar in batches, and that pending steps
+    are flushed before a reset, a description change or closing.
+    """
+    bar = _RecordingBar()
+    reporter = TqdmProgressReporter(bar, batch_size=4)
+
+    for _ in range(10):
+        reporter.update()
+    assert bar.updates == [4, 4]
+
+    reporter.set_description("Engine")
+    assert bar.updates == [4, 4, 2]
+
+    reporter.update(3)
+    reporter.reset(total=7)
+    reporter.update()
+    reporter.close()
+    assert bar.updates == [4, 4, 2, 3, 1]
+    assert bar.calls == [("description", "Engine"), ("reset", 7), ("close",)]
@@ -0,0 +1,46 @@
+"""
+Unit tests for the StatisticsTracker.
+"""
+import logging
+
+from chess_analyzer.statistics import StatisticsTracker
+
+
+def test_statistics_tracker_counts_and_resets(caplog):
+    """
+    Tests that counters accumulate, that skips are tallied per reason, and that reset clears everything.
+    """
+    tracker = StatisticsTracker()
+    tracker.add_game_read()
+    tracker.add_game_read()
+    tracker.add_game_analyzed()
+    tracker.add_game_skipped("already_processed")
+    tracker.add_fen_cache_hits(5)
+    tracker.add_fens_analyzed_by_engine(7)
+
+    assert (tracker.games_read, tracker.games_analyzed, tracker.games_skipped_total) == (2, 1, 1)
+    assert (tracker.fen_cache_hits, tracker.fens_analyzed_by_engine) == (5, 7)
+
+    with caplog.at_level(logging.INFO):
+        tracker.log_summary()
+    assert "Skipped (Already Processed): 1" in caplog.text
+    assert "Games with Critical Errors" not in caplog.text
+
+    tracker.reset()
+    assert (tracker.games_read, tracker.games_skipped_total, tracker.fen_cache_hits) == (0, 0, 0)
+
+
+def test_statistics_tracker_resolves_paths_once(tmp_path, monkeypatch):
+    """
+    Tests that relative paths are resolved against the working directory when first read, and cleared on reset.
+    """
+    monkeypatch.chdir(tmp_path)
+    tracker = StatisticsTracker()
+    tracker.set_db_path("cache.db")
+    tracker.set_report_path("report.csv")
+
+    assert tracker.db_path == str(tmp_path / "cache.db")
+    assert tracker.report_path == str(tmp_path / "report.csv")
+
+    tracker.reset()
+    assert tracker.db_path is None and tracker.report_path is None
@@ -0,0 +1,56 @@
+"""
+Unit tests for the BackgroundIterator.
+"""
+import threading
+
+import pytest
+
+from chess_analyzer.utils.background_iterator import BackgroundIterator
+
+
+def test_background_iterator_yields_items_in_order():
+    """
+    Tests that every item is delivered in order, even with a buffer smaller than the source.
+    """
+    with BackgroundIterator(range(50), max_buffered=2) as items:
+        assert list(items) == list(range(50))
+        assert list(items) == []
+
+
+def test_background_iterator_reraises_producer_error():
+    """
+    Tests that an exception raised by the source is re-raised in the consumer after the preceding items.
+    """
+    def failing():
+        yield 1
+        raise ValueError("bad game")
+
+    with BackgroundIterator(failing(), max_buffered=4) as items:
+        assert next(items) == 1
+        with pytest.raises(ValueError, match="bad game"):
+            next(items)
+
+
+def test_background_iterator_close_stops_and_closes_source():
+    """
+    Tests that closing early stops the producer thread and closes the source generator.
+    """
+    source_closed = threading.Event()
+
+    def endless():
+        try:
+            n = 0
+            while True:
+                yield n
+                n += 1
+        finally:
+            source_closed.set()
+
+    items = BackgroundIterator(endless(), max_buffered=2)
+    assert [next(items) for _ in range(3)] == [0, 1, 2]
+    items.close()
+
+    assert source_closed.is_set()
+    assert not items._thread.is_alive()
+    with pytest.raises(StopIteration):
+        next(items)
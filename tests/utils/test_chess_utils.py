@@ -0,0 +1,47 @@
+"""
+Unit tests for the chess utility functions.
+"""
+import chess
+import pytest
+
+from chess_analyzer.types import BoardSnapshot
+from chess_analyzer.utils.chess_utils import get_material_diff, get_material_diffs_for_move
+
+
+@pytest.mark.parametrize("fen, move_uci", [
+    (chess.STARTING_FEN, "e2e4"),
+    # Capture of a bishop.
+    ("rnbqk2r/pppp1ppp/5n2/4p3/1b2P3/2N5/PPPP1PPP/R1BQKBNR w KQkq - 2 4", "a2a3"),
+    ("rnbqk2r/pppp1ppp/5n2/4p3/1b2P3/P1N5/1PPP1PPP/R1BQKBNR b KQkq - 0 4", "b4c3"),
+    # En passant.
+    ("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3", "e5f6"),
+    # Promotion with capture, and underpromotion.
+    ("r3k3/1P6/8/8/8/8/8/4K3 w q - 0 1", "b7a8q"),
+    ("r3k3/1P6/8/8/8/8/8/4K3 w q - 0 1", "b7b8n"),
+    # Castling.
+    ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "e8c8"),
+])
+def test_get_material_diffs_for_move_matches_boards(fen, move_uci):
+    """
+    Tests that material differences read from a snapshot match those of the boards before and after the move.
+    """
+    board = chess.Board(fen)
+    move = chess.Move.from_uci(move_uci)
+    player_color = board.turn
+    expected_before = get_material_diff(board, player_color)
+    board_after = board.copy()
+    board_after.push(move)
+
+    assert get_material_diffs_for_move(BoardSnapshot.from_board(board), move) == (
+        expected_before, get_material_diff(board_after, player_color)
+    )
+
+
+def test_get_material_diffs_for_move_ignores_own_rook_in_chess960_castling():
+    """
+    Tests that Chess960 castling, encoded as the king moving onto its own rook, is not counted as a capture.
+    """
+    board = chess.Board("1r2k1r1/8/8/8/8/8/8/1R2K1R1 w GBgb - 0 1", chess960=True)
+    move = board.parse_san("O-O-O")
+
+    assert get_material_diffs_for_move(BoardSnapshot.from_board(board), move) == (0.0, 0.0)